@@ -1,183 +0,0 @@
-import board, pieces, numpy
-class Heuristics:
-
-    # The tables denote the points scored for the position of the chess pieces on the board.
-
-    PAWN_TABLE = numpy.array([
-        [ 0,  0,  0,  0,  0,  0,  0,  0],
-        [ 5, 10, 10,-20,-20, 10, 10,  5],
-        [ 5, -5,-10,  0,  0,-10, -5,  5],
-        [ 0,  0,  0, 20, 20,  0,  0,  0],
-        [ 5,  5, 10, 25, 25, 10,  5,  5],
-        [10, 10, 20, 30, 30, 20, 10, 10],
-        [50, 50, 50, 50, 50, 50, 50, 50],
-        [ 0,  0,  0,  0,  0,  0,  0,  0]
-    ])
-
-    KNIGHT_TABLE = numpy.array([
-        [-50, -40, -30, -30, -30, -30, -40, -50],
-        [-40, -20,   0,   5,   5,   0, -20, -40],
-        [-30,   5,  10,  15,  15,  10,   5, -30],
-        [-30,   0,  15,  20,  20,  15,   0, -30],
-        [-30,   5,  15,  20,  20,  15,   0, -30],
-        [-30,   0,  10,  15,  15,  10,   0, -30],
-        [-40, -20,   0,   0,   0,   0, -20, -40],
-        [-50, -40, -30, -30, -30, -30, -40, -50]
-    ])
-
-    BISHOP_TABLE = numpy.array([
-        [-20, -10, -10, -10, -10, -10, -10, -20],
-        [-10,   5,   0,   0,   0,   0,   5, -10],
-        [-10,  10,  10,  10,  10,  10,  10, -10],
-        [-10,   0,  10,  10,  10,  10,   0, -10],
-        [-10,   5,   5,  10,  10,   5,   5, -10],
-        [-10,   0,   5,  10,  10,   5,   0, -10],
-        [-10,   0,   0,   0,   0,   0,   0, -10],
-        [-20, -10, -10, -10, -10, -10, -10, -20]
-    ])
-
-    ROOK_TABLE = numpy.array([
-        [ 0,  0,  0,  5,  5,  0,  0,  0],
-        [-5,  0,  0,  0,  0,  0,  0, -5],
-        [-5,  0,  0,  0,  0,  0,  0, -5],
-        [-5,  0,  0,  0,  0,  0,  0, -5],
-        [-5,  0,  0,  0,  0,  0,  0, -5],
-        [-5,  0,  0,  0,  0,  0,  0, -5],
-        [ 5, 10, 10, 10, 10, 10, 10,  5],
-        [ 0,  0,  0,  0,  0,  0,  0,  0]
-    ])
-
-    QUEEN_TABLE = numpy.array([
-        [-20, -10, -10, -5, -5, -10, -10, -20],
-        [-10,   0,   5,  0,  0,   0,   0, -10],
-        [-10,   5,   5,  5,  5,   5,   0, -10],
-        [  0,   0,   5,  5,  5,   5,   0,  -5],
-        [ -5,   0,   5,  5,  5,   5,   0,  -5],
-        [-10,   0,   5,  5,  5,   5,   0, -10],
-        [-10,   0,   0,  0,  0,   0,   0, -10],
-        [-20, -10, -10, -5, -5, -10, -10, -20]
-    ])
-
-    @staticmethod
-    def evaluate(board):
-        material = Heuristics.get_material_score(board)
-
-        pawns = Heuristics.get_piece_position_score(board, pieces.Pawn.PIECE_TYPE, Heuristics.PAWN_TABLE)
-        knights = Heuristics.get_piece_position_score(board, pieces.Knight.PIECE_TYPE, Heuristics.KNIGHT_TABLE)
-        bishops = Heuristics.get_piece_position_score(board, pieces.Bishop.PIECE_TYPE, Heuristics.BISHOP_TABLE)
-        rooks = Heuristics.get_piece_position_score(board, pieces.Rook.PIECE_TYPE, Heuristics.ROOK_TABLE)
-        queens = Heuristics.get_piece_position_score(board, pieces.Queen.PIECE_TYPE, Heuristics.QUEEN_TABLE)
-
-        return material + pawns + knights + bishops + rooks + queens
-
-    # Returns the score for the position of the given type of piece.
-    # A piece type can for example be: pieces.Pawn.PIECE_TYPE.
-    # The table is the 2d numpy array used for the scoring. Example: Heuristics.PAWN_TABLE
-    @staticmethod
-    def get_piece_position_score(board, piece_type, table):
-        white = 0
-        black = 0
-        for x in range(8):
-            for y in range(8):
-                piece = board.chesspieces[x][y]
-                if (piece != 0):
-                    if (piece.piece_type == piece_type):
-                        if (piece.color == pieces.Piece.WHITE):
-                            white += table[x][y]
-                        else:
-                            black += table[7 - x][y]
-
-        return white - black
-
-    @staticmethod
-    def get_material_score(board):
-        white = 0
-        black = 0
-        for x in range(8):
-            for y in range(8):
-                piece = board.chesspieces[x][y]
-                if (piece != 0):
-                    if (piece.color == pieces.Piece.WHITE):
-                        white += piece.value
-                    else:
-                        black += piece.value
-
-        return white - black
-
-
-class AI:
-
-    INFINITE = 10000000
-
-    @staticmethod
-    def get_ai_move(chessboard, invalid_moves, depth = 3):
-        if invalid_moves is None:
-            invalid_moves = []
-        # Generate and filter moves
-        moves = [m for m in chessboard.get_possible_moves(pieces.Piece.BLACK)
-             if not AI.is_invalid_move(m, invalid_moves)]
-        # Order moves by static evaluation (captures/threats prioritized)
-        def move_score(m):
-            temp = board.Board.clone(chessboard)
-            temp.perform_move(m)
-            return Heuristics.evaluate(temp)
-        moves.sort(key=lambda m: move_score(m))
-
-        best_move = 0
-        best_score = AI.INFINITE
-        alpha, beta = -AI.INFINITE, AI.INFINITE
-        # Search with alpha-beta
-        for move in moves:
-            copy = board.Board.clone(chessboard)
-            copy.perform_move(move)
-            print(depth)
-            score = AI.alphabeta(copy, depth-1, alpha, beta, True)
-            if score < best_score:
-                best_score = score
-                best_move = move
-            beta = min(beta, best_score)
-            if beta <= alpha:
-                break
-        if best_move is None:
-            # No legal move: checkmate or stalemate
-            return None
-        
-        # Avoid moves that leave us in check
-        temp = board.Board.clone(chessboard)
-        temp.perform_move(best_move)
-        if temp.is_check(pieces.Piece.BLACK):
-            invalid_moves.append(best_move)
-            return AI.get_ai_move(chessboard, invalid_moves, depth)
-
-        return best_move
-    @staticmethod
-    def is_invalid_move(move, invalid_moves):
-        return any(inv.equals(move) for inv in invalid_moves)
-    @staticmethod
-    def alphabeta(node, depth, alpha, beta, maximizing):
-        if depth == 0:
-            return Heuristics.evaluate(node)
-        if maximizing:
-            max_eval = -AI.INFINITE
-            for m in node.get_possible_moves(pieces.Piece.WHITE):
-                child = board.Board.clone(node)
-                child.perform_move(m)
-                eval = AI.alphabeta(child, depth-1, alpha, beta, False)
-                max_eval = max(max_eval, eval)
-                alpha = max(alpha, eval)
-                if beta <= alpha:
-                    break
-            return max_eval
-        
-        min_eval = AI.INFINITE
-        for m in node.get_possible_moves(pieces.Piece.BLACK):
-            child = board.Board.clone(node)
-            child.perform_move(m)
-            eval = AI.alphabeta(child, depth-1, alpha, beta, True)
-            min_eval = min(min_eval, eval)
-            beta = min(beta, eval)
-            if beta <= alpha:
-                break
-        return min_eval
-    
-
@@ -0,0 +1,28 @@
+import argparse, sys
+from engine import analysis
+
+# Command line batch analysis of the positions in an EPD or PGN file:
+#
+#     python analyse.py games.pgn -o games.jsonl --workers 4 --depth 3
+#
+# Every line of the output is a JSON object with the id, fen, best_move (UCI),
+# score (centipawns from white's point of view), depth, nodes and time of a
+# position. A position with an invalid FEN gets a line with its id, fen and an
+# error instead, and unreadable EPD lines are skipped with a warning. After an
+# interrupt, run the same command with --resume to continue.
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyse the positions of an EPD or PGN file.")
+    parser.add_argument("input", help="EPD file, or PGN file (.pgn) whose every position is analysed")
+    parser.add_argument("-o", "--output", required=True, help="JSON lines output, also used as the checkpoint")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--movetime", type=float, default=None, help="time limit per position in seconds")
+    parser.add_argument("--resume", action="store_true", help="skip the positions already in the output")
+    args = parser.parse_args()
+
+    try:
+        count = analysis.analyse_file(args.input, args.output, args.workers, args.depth, args.movetime, args.resume)
+    except KeyboardInterrupt:
+        sys.exit(f"Interrupted, run again with --resume to continue into {args.output}")
+    print(f"Analysed {count} positions into {args.output}")
@@ -0,0 +1,111 @@
+# Compares the throughput of Heuristics.evaluate with the previous evaluator
+# (material plus five piece-square tables) on positions from random games, and
+# reports the pawn hash table hit rate. The timed runs evaluate every position
+# several times, which would hit the pawn hash on purpose, so the hit rate is
+# measured separately: over one pass on the positions with an empty table, and
+# during a search from the initial position. Exits with an error when the
+# tapered evaluator is more than MAX_SLOWDOWN times slower.
+#
+#     python benchmarks/eval_throughput.py --games 20 --repeat 5
+import argparse, os, random, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import board, pieces
+from engine.ai import AI, Heuristics
+
+MAX_SLOWDOWN = 2.0
+
+
+# The evaluator before the tapered one, kept here as the reference.
+def legacy_evaluate(chessboard):
+    tables = {
+        pieces.Pawn.PIECE_TYPE: Heuristics.PAWN_TABLE,
+        pieces.Knight.PIECE_TYPE: Heuristics.KNIGHT_TABLE,
+        pieces.Bishop.PIECE_TYPE: Heuristics.BISHOP_TABLE,
+        pieces.Rook.PIECE_TYPE: Heuristics.ROOK_TABLE,
+        pieces.Queen.PIECE_TYPE: Heuristics.QUEEN_TABLE,
+    }
+    score = 0
+    for x in range(8):
+        for y in range(8):
+            piece = chessboard.chesspieces[x][y]
+            if piece != 0:
+                score += piece.value if piece.color == pieces.Piece.WHITE else -piece.value
+    for piece_type, table in tables.items():
+        for x in range(8):
+            for y in range(8):
+                piece = chessboard.chesspieces[x][y]
+                if piece != 0 and piece.piece_type == piece_type:
+                    if piece.color == pieces.Piece.WHITE:
+                        score += table[x][y]
+                    else:
+                        score -= table[7 - x][y]
+    return score
+
+
+def random_positions(games, plies, seed):
+    rng = random.Random(seed)
+    positions = []
+    for game in range(games):
+        chessboard = board.Board.new()
+        color = pieces.Piece.WHITE
+        for ply in range(plies):
+            moves = chessboard.get_possible_moves(color)
+            if not moves:
+                break
+            chessboard.perform_move(rng.choice(moves))
+            positions.append(board.Board.clone(chessboard))
+            color = pieces.Piece.BLACK if color == pieces.Piece.WHITE else pieces.Piece.WHITE
+    return positions
+
+
+def throughput(evaluate, positions, repeat):
+    start = time.perf_counter()
+    for i in range(repeat):
+        for position in positions:
+            evaluate(position)
+    return len(positions) * repeat / (time.perf_counter() - start)
+
+
+# Pawn hash hit rate of one evaluation of every position, from an empty table.
+def first_pass_hit_rate(positions):
+    Heuristics.pawn_hash_table.clear()
+    for position in positions:
+        Heuristics.evaluate(position)
+    return Heuristics.pawn_hash_table.hit_rate()
+
+
+# Pawn hash hit rate of a search from the initial position, from empty tables.
+def search_hit_rate(depth):
+    Heuristics.pawn_hash_table.clear()
+    AI.transposition_table.clear()
+    AI.search(board.Board.new(), pieces.Piece.WHITE, depth)
+    return Heuristics.pawn_hash_table.hit_rate()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--plies", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--search-depth", type=int, default=3)
+    args = parser.parse_args()
+
+    positions = random_positions(args.games, args.plies, args.seed)
+    first_pass = first_pass_hit_rate(positions)
+    in_search = search_hit_rate(args.search_depth)
+    Heuristics.pawn_hash_table.clear()
+    legacy = throughput(legacy_evaluate, positions, args.repeat)
+    tapered = throughput(Heuristics.evaluate, positions, args.repeat)
+    print(f"positions:        {len(positions)}")
+    print(f"legacy evaluator: {legacy:.0f} positions/s")
+    print(f"tapered:          {tapered:.0f} positions/s ({tapered / legacy:.2f}x the legacy speed)")
+    print(f"pawn hash hits:   {first_pass:.1%} over one pass, {in_search:.1%} in a depth {args.search_depth} search")
+    if legacy / tapered > MAX_SLOWDOWN:
+        sys.exit(f"tapered evaluation is more than {MAX_SLOWDOWN}x slower than the legacy one")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# Guards the startup time of the headless engine. Imports `engine` in fresh
+# interpreters, reports the median import time and exits with an error if it
+# is over the budget or if numpy or pygame got imported along the way.
+#
+#     python benchmarks/import_time.py --runs 10 --budget 0.1
+import argparse, os, statistics, subprocess, sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["numpy", "pygame"]
+
+CHILD = """
+import sys, time
+start = time.perf_counter()
+import engine
+elapsed = time.perf_counter() - start
+print(elapsed, ",".join(m for m in %r if m in sys.modules))
+""" % (HEAVY_MODULES,)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget", type=float, default=0.1, help="median import time budget in seconds")
+    args = parser.parse_args()
+
+    times = []
+    for i in range(args.runs):
+        output = subprocess.run([sys.executable, "-c", CHILD], cwd=ROOT, check=True,
+                                capture_output=True, text=True).stdout.split()
+        times.append(float(output[0]))
+        if len(output) > 1:
+            sys.exit(f"importing engine pulled in: {output[1]}")
+
+    median = statistics.median(times)
+    print(f"engine import: median {median * 1000:.1f} ms, max {max(times) * 1000:.1f} ms over {args.runs} runs")
+    if median > args.budget:
+        sys.exit(f"engine import is over the {args.budget * 1000:.0f} ms budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# Compares the search with the moves of every node built up front
+# (Board.get_possible_moves) and with the staged generator
+# (Board.generate_moves): nodes, moves generated and legality checks per node,
+# and time, on positions from random games searched to a fixed depth.
+#
+# The staged generator both orders the captures (MVV-LVA) and builds and checks
+# the moves lazily. A third run builds every move up front but orders them like
+# the staged generator, so the node count difference between the first two runs
+# is the ordering, and the work difference between the last two is the laziness.
+#
+#     python benchmarks/movegen.py --positions 20 --depth 3
+import argparse, os, random, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import board, notation, pieces
+from engine.ai import AI
+
+
+def random_positions(count, seed):
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        chessboard = board.Board.new()
+        color = pieces.Piece.WHITE
+        for ply in range(rng.randrange(6, 40)):
+            moves = chessboard.get_possible_moves(color)
+            if not moves:
+                break
+            chessboard.perform_move(rng.choice(moves))
+            color = notation.other_color(color)
+        if chessboard.get_possible_moves(color):
+            positions.append((chessboard, color))
+    return positions
+
+
+def run(positions, depth, lazy, ordered):
+    AI.lazy_move_generation = lazy
+    AI.order_full_move_list = ordered
+    AI.nodes = 0
+    board.Board.generated_moves = 0
+    board.Board.legality_checks = 0
+    start = time.perf_counter()
+    for chessboard, color in positions:
+        AI.transposition_table.clear()
+        AI.get_best_move(chessboard, color, depth)
+    elapsed = time.perf_counter() - start
+    return AI.nodes, board.Board.generated_moves, board.Board.legality_checks, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--positions", type=int, default=20)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    positions = random_positions(args.positions, args.seed)
+    modes = (
+        ("full lists          ", False, False),
+        ("full lists, MVV-LVA ", False, True),
+        ("staged              ", True, False),
+    )
+    saved = AI.lazy_move_generation, AI.order_full_move_list
+    try:
+        for label, lazy, ordered in modes:
+            nodes, generated, checks, elapsed = run(positions, args.depth, lazy, ordered)
+            print(f"{label}: {nodes} nodes, {generated / max(nodes, 1):.1f} moves generated and "
+                  f"{checks / max(nodes, 1):.1f} legality checks per node, {elapsed:.2f}s")
+    finally:
+        AI.lazy_move_generation, AI.order_full_move_list = saved
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# Measures the perceived AI latency (seconds from the player's move until the
+# AI answer is known) with and without pondering, on headless games where a
+# simulated player thinks for a fixed time before each move.
+#
+#     python benchmarks/ponder_latency.py --moves 10 --think 2 --depth 3
+import argparse, os, random, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import board, pieces
+from engine.ai import AI, Heuristics
+from engine.ponder import Ponderer
+
+
+# The simulated player picks one of its three best moves by static evaluation,
+# so the ponder guess is right only part of the time.
+def player_move(chessboard, rng):
+    scored = []
+    for move in chessboard.get_possible_moves(pieces.Piece.WHITE):
+        child = board.Board.clone(chessboard)
+        child.perform_move(move)
+        scored.append((Heuristics.evaluate(child), move))
+    if not scored:
+        return None
+    scored.sort(key=lambda s: -s[0])
+    return rng.choice(scored[:3])[1]
+
+
+def play(moves, think, depth, ponder, seed):
+    AI.transposition_table.clear()
+    rng = random.Random(seed)
+    ponderer = Ponderer(depth=depth) if ponder else None
+    chessboard = board.Board.new()
+    latencies = []
+    for i in range(moves):
+        if ponderer:
+            ponderer.start(chessboard)
+        time.sleep(think)
+        move = player_move(chessboard, rng)
+        if move is None:
+            break
+        chessboard.perform_move(move)
+
+        start = time.perf_counter()
+        ai_move = ponderer.resolve(move) if ponderer else None
+        if ai_move is None:
+            ai_move = AI.get_ai_move(chessboard, [], depth)
+        latencies.append(time.perf_counter() - start)
+        if ai_move is None:
+            break
+        chessboard.perform_move(ai_move)
+    if ponderer:
+        ponderer.stop()
+        print(f"ponder hits: {ponderer.hits}, misses: {ponderer.misses}")
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--moves", type=int, default=10)
+    parser.add_argument("--think", type=float, default=2.0, help="simulated player think time in seconds")
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    without = play(args.moves, args.think, args.depth, False, args.seed)
+    with_ponder = play(args.moves, args.think, args.depth, True, args.seed)
+    avg_without = sum(without) / len(without)
+    avg_with = sum(with_ponder) / len(with_ponder)
+    print(f"without pondering: {avg_without:.3f}s per move")
+    print(f"with pondering:    {avg_with:.3f}s per move")
+    print(f"reduction:         {avg_without - avg_with:.3f}s per move")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# Load test for serve.py: plays many games at once against a running server,
+# with random legal moves for white, and reports the client side move latency
+# along with the server metrics.
+#
+#     python serve.py --workers 4 &
+#     python benchmarks/server_load.py --games 20 --moves 5
+import argparse, asyncio, json, random, statistics, time
+
+
+async def request(host, port, method, path, body = None):
+    reader, writer = await asyncio.open_connection(host, port)
+    data = json.dumps(body).encode() if body is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode() + data)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    status = int(head.split()[1])
+    return status, json.loads(payload)
+
+
+async def play_game(args, rng, latencies, counters):
+    status, game = await request(args.host, args.port, "POST", "/games",
+                                 {"depth": args.depth, "movetime": args.movetime})
+    path = f"/games/{game['id']}"
+    moves = 0
+    while moves < args.moves and game["status"] == "playing" and game["legal_moves"]:
+        start = time.perf_counter()
+        status, reply = await request(args.host, args.port, "POST", path + "/move",
+                                      {"move": rng.choice(game["legal_moves"])})
+        if status == 503:
+            counters["rejected"] += 1
+            await asyncio.sleep(0.5)
+            continue
+        if status != 200:
+            raise RuntimeError(f"{path}: {status} {reply}")
+        latencies.append(time.perf_counter() - start)
+        game = reply
+        moves += 1
+    await request(args.host, args.port, "DELETE", path)
+
+
+async def main(args):
+    rng = random.Random(args.seed)
+    latencies = []
+    counters = {"rejected": 0}
+    start = time.perf_counter()
+    await asyncio.gather(*(play_game(args, rng, latencies, counters) for i in range(args.games)))
+    elapsed = time.perf_counter() - start
+    ordered = sorted(latencies)
+    print(f"{len(latencies)} moves in {elapsed:.1f}s ({len(latencies) / elapsed:.2f} moves/s), "
+          f"{counters['rejected']} rejected with 503")
+    if ordered:
+        p99 = ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))]
+        print(f"client latency: p50 {statistics.median(ordered):.3f}s, p99 {p99:.3f}s")
+    status, metrics = await request(args.host, args.port, "GET", "/metrics")
+    print("server metrics:", json.dumps(metrics))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--moves", type=int, default=5, help="player moves per game")
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--movetime", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,146 @@
+# Runs a tactical test suite (EPD with "bm" best moves or "am" avoid moves,
+# WAC style) and measures how fast the search finds the solutions. Every
+# position is searched with iterative deepening up to --depth, or until
+# --movetime runs out. For a solved position it records the time and nodes
+# at the depth from which the best move was correct and stayed correct.
+#
+#     python benchmarks/tactics.py wac.epd --depth 4 --save results.json
+#     python benchmarks/tactics.py wac.epd --depth 4 --baseline results.json
+import argparse, json, os, statistics, sys, threading, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import notation
+from engine.ai import AI
+
+
+# Returns (best moves, moves to avoid) of a position as engine moves. Raises
+# NotationError when one of them is not a legal move of the engine, e.g. an en
+# passant capture or an under-promotion.
+def parse_solutions(chessboard, color, operations):
+    solutions = [notation.parse_san(chessboard, color, san) for san in operations.get("bm", [])]
+    avoid = [notation.parse_san(chessboard, color, san) for san in operations.get("am", [])]
+    return solutions, avoid
+
+
+def is_correct(move, solutions, avoid):
+    if move is None:
+        return False
+    if solutions:
+        return any(solution.equals(move) for solution in solutions)
+    return not any(avoided.equals(move) for avoided in avoid)
+
+
+# Searches one position and returns its result as a dict. Each position gets
+# an empty transposition table so the numbers do not depend on the order.
+# Positions without solutions, or whose solutions the engine cannot play, are
+# not searched; their result has "unsupported" set to the reason.
+def solve(position_id, fen, operations, max_depth, movetime):
+    result = {"id": position_id, "solved": False, "depth": None, "time": None, "nodes": None, "move": None}
+    chessboard, color = notation.parse_fen(fen)
+    try:
+        solutions, avoid = parse_solutions(chessboard, color, operations)
+    except notation.NotationError as e:
+        result["unsupported"] = str(e)
+        return result
+    if not solutions and not avoid:
+        # Every move would count as correct.
+        result["unsupported"] = "no bm/am operation"
+        return result
+
+    AI.transposition_table.clear()
+    AI.nodes = 0
+    stop = threading.Event()
+    timer = None
+    if movetime:
+        timer = threading.Timer(movetime, stop.set)
+        timer.start()
+
+    start = time.perf_counter()
+    for depth, move, score in AI.iterative_deepening(chessboard, color, max_depth, stop):
+        result["move"] = notation.move_to_uci(move) if move is not None else None
+        if is_correct(move, solutions, avoid):
+            if not result["solved"]:
+                result.update(solved=True, depth=depth, time=round(time.perf_counter() - start, 4), nodes=AI.nodes)
+        else:
+            result.update(solved=False, depth=None, time=None, nodes=None)
+    if timer is not None:
+        timer.cancel()
+    return result
+
+
+# Returns (solved, searched, unsupported, median time, median nodes).
+def summary(results):
+    solved = [r for r in results if r["solved"]]
+    unsupported = sum(1 for r in results if r.get("unsupported"))
+    median_time = statistics.median(r["time"] for r in solved) if solved else None
+    median_nodes = statistics.median(r["nodes"] for r in solved) if solved else None
+    return len(solved), len(results) - unsupported, unsupported, median_time, median_nodes
+
+
+def print_summary(label, results):
+    solved, searched, unsupported, median_time, median_nodes = summary(results)
+    line = f"{label}: solved {solved}/{searched}"
+    if unsupported:
+        line += f" ({unsupported} unsupported skipped)"
+    if solved:
+        line += f", median time-to-solve {median_time:.3f}s, median nodes {median_nodes:.0f}"
+    print(line)
+
+
+# Prints the positions whose outcome changed and the aggregate numbers of
+# both runs.
+def print_diff(results, baseline):
+    before = {r["id"]: r for r in baseline}
+    for result in results:
+        old = before.get(result["id"])
+        if old is None or old.get("unsupported") or result.get("unsupported"):
+            continue
+        if result["solved"] and not old["solved"]:
+            print(f"  {result['id']}: now solved in {result['time']:.3f}s")
+        elif old["solved"] and not result["solved"]:
+            print(f"  {result['id']}: no longer solved (was {old['time']:.3f}s)")
+        elif result["solved"] and old["solved"]:
+            print(f"  {result['id']}: {old['time']:.3f}s -> {result['time']:.3f}s, "
+                  f"{old['nodes']} -> {result['nodes']} nodes")
+    print_summary("baseline", baseline)
+    print_summary("current ", results)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("suite", help="EPD file with bm or am operations")
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--movetime", type=float, default=None, help="time limit per position in seconds")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare with results saved earlier")
+    args = parser.parse_args()
+
+    results = []
+    with open(args.suite) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip() or line.startswith("#"):
+                continue
+            fen, operations = notation.parse_epd(line)
+            position_id = operations.get("id", [str(line_number)])[0]
+            result = solve(position_id, fen, operations, args.depth, args.movetime)
+            if result.get("unsupported"):
+                print(f"{position_id}: skipped, unsupported solution ({result['unsupported']})")
+            elif result["solved"]:
+                print(f"{position_id}: solved at depth {result['depth']} in {result['time']:.3f}s, {result['nodes']} nodes")
+            else:
+                print(f"{position_id}: not solved (played {result['move']})")
+            results.append(result)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=1)
+    if args.baseline:
+        with open(args.baseline) as f:
+            print_diff(results, json.load(f))
+    else:
+        print_summary("total", results)
+
+
+if __name__ == "__main__":
+    main()
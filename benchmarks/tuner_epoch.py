@@ -0,0 +1,38 @@
+# Times tuning epochs on a synthetic training set of random positions (one
+# million by default), to check that an epoch takes seconds.
+#
+#     python benchmarks/tuner_epoch.py --positions 1000000 --epochs 2
+import argparse, os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy
+from engine import tuning
+
+
+def random_training_set(size, seed):
+    rng = numpy.random.default_rng(seed)
+    return tuning.TrainingSet(
+        rng.integers(0, tuning.TABLE_SIZE, (size, tuning.MAX_PIECES), dtype=numpy.int16),
+        rng.choice(numpy.array([-1, 0, 1], numpy.int8), (size, tuning.MAX_PIECES)),
+        rng.random(size, dtype=numpy.float32),
+        numpy.zeros(size, numpy.float32),
+        rng.choice(numpy.array([0.0, 0.5, 1.0], numpy.float32), size),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--positions", type=int, default=1000000)
+    parser.add_argument("--epochs", type=int, default=2)
+    args = parser.parse_args()
+
+    training_set = random_training_set(args.positions, 0)
+    times = []
+    tuning.tune(training_set, tuning.current_parameters(), args.epochs,
+                report=lambda epoch, loss, seconds: times.append(seconds))
+    print(f"{args.positions} positions: {sum(times) / len(times):.2f}s per epoch")
+
+
+if __name__ == "__main__":
+    main()
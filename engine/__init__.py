@@ -0,0 +1,8 @@
+# The chess engine: board, pieces, moves, search and evaluation. It only needs
+# the standard library, so it imports quickly in worker processes and command
+# line tools. The pygame GUI (gui.py) is an optional layer on top of it, and
+# features that need numpy import it themselves when they are used.
+from .move import Move
+from .pieces import Piece, Pawn, Knight, Bishop, Rook, Queen, King
+from .board import Board
+from .ai import AI, Heuristics
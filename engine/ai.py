@@ -0,0 +1,574 @@
+import json, os, threading
+from . import board, pieces
+
+
+# Flattens an 8x8 table to a list indexed by row * 8 + column.
+def flatten(table):
+    return [value for row in table for value in row]
+
+
+class Heuristics:
+
+    # The tables denote the points scored for the position of the chess pieces on the board.
+
+    PAWN_TABLE = [
+        [ 0,  0,  0,  0,  0,  0,  0,  0],
+        [ 5, 10, 10,-20,-20, 10, 10,  5],
+        [ 5, -5,-10,  0,  0,-10, -5,  5],
+        [ 0,  0,  0, 20, 20,  0,  0,  0],
+        [ 5,  5, 10, 25, 25, 10,  5,  5],
+        [10, 10, 20, 30, 30, 20, 10, 10],
+        [50, 50, 50, 50, 50, 50, 50, 50],
+        [ 0,  0,  0,  0,  0,  0,  0,  0]
+    ]
+
+    KNIGHT_TABLE = [
+        [-50, -40, -30, -30, -30, -30, -40, -50],
+        [-40, -20,   0,   5,   5,   0, -20, -40],
+        [-30,   5,  10,  15,  15,  10,   5, -30],
+        [-30,   0,  15,  20,  20,  15,   0, -30],
+        [-30,   5,  15,  20,  20,  15,   0, -30],
+        [-30,   0,  10,  15,  15,  10,   0, -30],
+        [-40, -20,   0,   0,   0,   0, -20, -40],
+        [-50, -40, -30, -30, -30, -30, -40, -50]
+    ]
+
+    BISHOP_TABLE = [
+        [-20, -10, -10, -10, -10, -10, -10, -20],
+        [-10,   5,   0,   0,   0,   0,   5, -10],
+        [-10,  10,  10,  10,  10,  10,  10, -10],
+        [-10,   0,  10,  10,  10,  10,   0, -10],
+        [-10,   5,   5,  10,  10,   5,   5, -10],
+        [-10,   0,   5,  10,  10,   5,   0, -10],
+        [-10,   0,   0,   0,   0,   0,   0, -10],
+        [-20, -10, -10, -10, -10, -10, -10, -20]
+    ]
+
+    ROOK_TABLE = [
+        [ 0,  0,  0,  5,  5,  0,  0,  0],
+        [-5,  0,  0,  0,  0,  0,  0, -5],
+        [-5,  0,  0,  0,  0,  0,  0, -5],
+        [-5,  0,  0,  0,  0,  0,  0, -5],
+        [-5,  0,  0,  0,  0,  0,  0, -5],
+        [-5,  0,  0,  0,  0,  0,  0, -5],
+        [ 5, 10, 10, 10, 10, 10, 10,  5],
+        [ 0,  0,  0,  0,  0,  0,  0,  0]
+    ]
+
+    QUEEN_TABLE = [
+        [-20, -10, -10, -5, -5, -10, -10, -20],
+        [-10,   0,   5,  0,  0,   0,   0, -10],
+        [-10,   5,   5,  5,  5,   5,   0, -10],
+        [  0,   0,   5,  5,  5,   5,   0,  -5],
+        [ -5,   0,   5,  5,  5,   5,   0,  -5],
+        [-10,   0,   5,  5,  5,   5,   0, -10],
+        [-10,   0,   0,  0,  0,   0,   0, -10],
+        [-20, -10, -10, -5, -5, -10, -10, -20]
+    ]
+
+    KING_MG_TABLE = [
+        [ 20,  30,  10,   0,   0,  10,  30,  20],
+        [ 20,  20,   0,   0,   0,   0,  20,  20],
+        [-10, -20, -20, -20, -20, -20, -20, -10],
+        [-20, -30, -30, -40, -40, -30, -30, -20],
+        [-30, -40, -40, -50, -50, -40, -40, -30],
+        [-30, -40, -40, -50, -50, -40, -40, -30],
+        [-30, -40, -40, -50, -50, -40, -40, -30],
+        [-30, -40, -40, -50, -50, -40, -40, -30]
+    ]
+
+    # Endgame tables: pawns are worth more the closer they get to promotion
+    # and the king should walk to the centre.
+    PAWN_EG_TABLE = [
+        [ 0,  0,  0,  0,  0,  0,  0,  0],
+        [10, 10, 10, 10, 10, 10, 10, 10],
+        [10, 10, 10, 10, 10, 10, 10, 10],
+        [20, 20, 20, 20, 20, 20, 20, 20],
+        [30, 30, 30, 30, 30, 30, 30, 30],
+        [50, 50, 50, 50, 50, 50, 50, 50],
+        [80, 80, 80, 80, 80, 80, 80, 80],
+        [ 0,  0,  0,  0,  0,  0,  0,  0]
+    ]
+
+    KING_EG_TABLE = [
+        [-50, -30, -30, -30, -30, -30, -30, -50],
+        [-30, -30,   0,   0,   0,   0, -30, -30],
+        [-30, -10,  20,  30,  30,  20, -10, -30],
+        [-30, -10,  30,  40,  40,  30, -10, -30],
+        [-30, -10,  30,  40,  40,  30, -10, -30],
+        [-30, -10,  20,  30,  30,  20, -10, -30],
+        [-30, -20, -10,   0,   0, -10, -20, -30],
+        [-50, -40, -30, -20, -20, -30, -40, -50]
+    ]
+
+    # The tables are written from white's point of view with the first row being
+    # rank 1. They are flattened to lists indexed by row * 8 + column,
+    # which is a lot faster to read from in the evaluation loop.
+    MG_TABLES = {
+        pieces.Pawn.PIECE_TYPE: flatten(PAWN_TABLE),
+        pieces.Knight.PIECE_TYPE: flatten(KNIGHT_TABLE),
+        pieces.Bishop.PIECE_TYPE: flatten(BISHOP_TABLE),
+        pieces.Rook.PIECE_TYPE: flatten(ROOK_TABLE),
+        pieces.Queen.PIECE_TYPE: flatten(QUEEN_TABLE),
+        pieces.King.PIECE_TYPE: flatten(KING_MG_TABLE),
+    }
+
+    EG_TABLES = {
+        pieces.Pawn.PIECE_TYPE: flatten(PAWN_EG_TABLE),
+        pieces.Knight.PIECE_TYPE: flatten(KNIGHT_TABLE),
+        pieces.Bishop.PIECE_TYPE: flatten(BISHOP_TABLE),
+        pieces.Rook.PIECE_TYPE: flatten(ROOK_TABLE),
+        pieces.Queen.PIECE_TYPE: flatten(QUEEN_TABLE),
+        pieces.King.PIECE_TYPE: flatten(KING_EG_TABLE),
+    }
+
+    # Game phase: 24 with all the pieces on the board, 0 with only kings and pawns.
+    # The score is blended linearly between the midgame and endgame scores.
+    PHASE_WEIGHTS = {
+        pieces.Pawn.PIECE_TYPE: 0,
+        pieces.Knight.PIECE_TYPE: 1,
+        pieces.Bishop.PIECE_TYPE: 1,
+        pieces.Rook.PIECE_TYPE: 2,
+        pieces.Queen.PIECE_TYPE: 4,
+        pieces.King.PIECE_TYPE: 0,
+    }
+    TOTAL_PHASE = 24
+
+    # Pawn structure terms as (midgame, endgame), per pawn.
+    DOUBLED_PAWN = (-10, -20)
+    ISOLATED_PAWN = (-10, -15)
+    # Passed pawn bonus by the number of steps the pawn has advanced.
+    PASSED_PAWN_MG = [0, 5, 10, 20, 35, 60, 0, 0]
+    PASSED_PAWN_EG = [0, 10, 20, 40, 70, 120, 0, 0]
+
+    # King safety (midgame only): pawns right in front of the king and
+    # two squares in front of it, and files next to the king without own pawns.
+    PAWN_SHIELD = (10, 5)
+    OPEN_FILE_NEAR_KING = -15
+
+    pawn_hash_table = None  # Set below the class.
+
+    @staticmethod
+    def evaluate(board):
+        mg = 0
+        eg = 0
+        phase = 0
+        white_king = None
+        black_king = None
+        for x in range(8):
+            column = board.chesspieces[x]
+            for y in range(8):
+                piece = column[y]
+                if piece != 0:
+                    piece_type = piece.piece_type
+                    if piece.color == pieces.Piece.WHITE:
+                        square = (7 - y) * 8 + x
+                        mg += piece.value + Heuristics.MG_TABLES[piece_type][square]
+                        eg += piece.value + Heuristics.EG_TABLES[piece_type][square]
+                        if piece_type == pieces.King.PIECE_TYPE:
+                            white_king = piece
+                    else:
+                        square = y * 8 + x
+                        mg -= piece.value + Heuristics.MG_TABLES[piece_type][square]
+                        eg -= piece.value + Heuristics.EG_TABLES[piece_type][square]
+                        if piece_type == pieces.King.PIECE_TYPE:
+                            black_king = piece
+                    phase += Heuristics.PHASE_WEIGHTS[piece_type]
+
+        structure_mg, structure_eg = Heuristics.get_structure_score(board, white_king, black_king)
+        mg += structure_mg
+        eg += structure_eg
+
+        phase = min(phase, Heuristics.TOTAL_PHASE)
+        # int() truncates towards zero so the score stays symmetric for both colors.
+        return int((mg * phase + eg * (Heuristics.TOTAL_PHASE - phase)) / Heuristics.TOTAL_PHASE)
+
+    # Returns the (midgame, endgame) score of the pawn structure and king safety,
+    # everything but the material and the piece-square tables.
+    @staticmethod
+    def get_structure_score(board, white_king, black_king):
+        mg, eg, white_files, black_files = Heuristics.get_pawn_structure(board)
+        if white_king is not None:
+            mg += Heuristics.get_king_safety(board, white_king, white_files)
+        if black_king is not None:
+            mg -= Heuristics.get_king_safety(board, black_king, black_files)
+        return mg, eg
+
+    # Returns (midgame score, endgame score, white pawn files, black pawn files)
+    # for the pawns on the board, from the pawn hash table when possible. The
+    # files are bitmasks with bit x set when the side has a pawn on column x.
+    @staticmethod
+    def get_pawn_structure(board):
+        entry = Heuristics.pawn_hash_table.probe(board.pawn_key)
+        if entry is None:
+            entry = Heuristics.compute_pawn_structure(board)
+            Heuristics.pawn_hash_table.store(board.pawn_key, entry)
+        return entry
+
+    @staticmethod
+    def compute_pawn_structure(board):
+        white_pawns = []
+        black_pawns = []
+        for x in range(8):
+            for y in range(8):
+                piece = board.chesspieces[x][y]
+                if piece != 0 and piece.piece_type == pieces.Pawn.PIECE_TYPE:
+                    if piece.color == pieces.Piece.WHITE:
+                        white_pawns.append((x, y))
+                    else:
+                        black_pawns.append((x, y))
+
+        white_mg, white_eg, white_files = Heuristics.score_pawns(white_pawns, black_pawns, -1)
+        black_mg, black_eg, black_files = Heuristics.score_pawns(black_pawns, white_pawns, 1)
+        return (white_mg - black_mg, white_eg - black_eg, white_files, black_files)
+
+    # Scores one side's pawns. Direction is the way they move on the board:
+    # -1 for white, 1 for black.
+    @staticmethod
+    def score_pawns(own_pawns, enemy_pawns, direction):
+        mg = 0
+        eg = 0
+        files = 0
+        counts = [0] * 8
+        for x, y in own_pawns:
+            files |= 1 << x
+            counts[x] += 1
+
+        for x, y in own_pawns:
+            # Isolated: no own pawn on a neighbouring file.
+            if not (counts[x - 1] if x > 0 else 0) and not (counts[x + 1] if x < 7 else 0):
+                mg += Heuristics.ISOLATED_PAWN[0]
+                eg += Heuristics.ISOLATED_PAWN[1]
+
+            # Passed: no enemy pawn in front of it on the same or a neighbouring file.
+            passed = True
+            for ex, ey in enemy_pawns:
+                if abs(ex - x) <= 1 and (ey - y) * direction > 0:
+                    passed = False
+                    break
+            if passed:
+                advanced = 6 - y if direction == -1 else y - 1
+                mg += Heuristics.PASSED_PAWN_MG[advanced]
+                eg += Heuristics.PASSED_PAWN_EG[advanced]
+
+        for count in counts:
+            if count > 1:
+                mg += Heuristics.DOUBLED_PAWN[0] * (count - 1)
+                eg += Heuristics.DOUBLED_PAWN[1] * (count - 1)
+
+        return mg, eg, files
+
+    # Returns the (midgame) king safety score of the given king. Files are the
+    # pawn files of the king's side, as returned by get_pawn_structure.
+    @staticmethod
+    def get_king_safety(board, king, files):
+        direction = -1 if king.color == pieces.Piece.WHITE else 1
+        score = 0
+        for x in range(king.x - 1, king.x + 2):
+            if x < 0 or x > 7:
+                continue
+            for distance in (1, 2):
+                piece = board.get_piece(x, king.y + direction * distance)
+                if piece != 0 and piece.piece_type == pieces.Pawn.PIECE_TYPE and piece.color == king.color:
+                    score += Heuristics.PAWN_SHIELD[distance - 1]
+                    break
+            if not files & (1 << x):
+                score += Heuristics.OPEN_FILE_NEAR_KING
+        return score
+
+    # Loads the piece values and midgame/endgame tables written by the tuner
+    # (tune.py). Tables are 8x8 like the ones above; missing entries keep
+    # their current values.
+    @staticmethod
+    def load_parameters(path):
+        with open(path) as f:
+            parameters = json.load(f)
+        for piece_type, value in parameters.get("piece_values", {}).items():
+            pieces.PIECE_CLASSES[piece_type].VALUE = value
+        for piece_type, table in parameters.get("mg_tables", {}).items():
+            Heuristics.MG_TABLES[piece_type] = flatten(table)
+        for piece_type, table in parameters.get("eg_tables", {}).items():
+            Heuristics.EG_TABLES[piece_type] = flatten(table)
+
+
+# Caches the pawn structure evaluation keyed by Board.pawn_key. Pawns move
+# rarely compared to the other pieces, so almost every lookup in a search hits.
+class PawnHashTable:
+
+    def __init__(self, max_entries = 65536):
+        self.max_entries = max_entries
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def probe(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def store(self, key, entry):
+        if len(self.entries) >= self.max_entries and key not in self.entries:
+            self.entries.clear()
+        self.entries[key] = entry
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+Heuristics.pawn_hash_table = PawnHashTable()
+
+# Tuned parameters are loaded at startup when tune.py has written them.
+PARAMETERS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "parameters.json")
+if os.path.exists(PARAMETERS_FILE):
+    Heuristics.load_parameters(PARAMETERS_FILE)
+
+
+# Raised inside the search when its stop event is set, e.g. when a ponder
+# search is abandoned because the player did not play the predicted move.
+class SearchAborted(Exception):
+    pass
+
+
+# Remembers the result of searched positions keyed by (zobrist key, side to move).
+# Entries are only stored once a node is fully searched, so an aborted search
+# leaves nothing half-done behind. When it is full the table is simply cleared.
+class TranspositionTable:
+
+    EXACT = 0
+    LOWER = 1
+    UPPER = 2
+
+    def __init__(self, max_entries = 1000000):
+        self.max_entries = max_entries
+        self.entries = {}
+
+    # Returns (depth, score, flag, best_move) or None.
+    def probe(self, key):
+        return self.entries.get(key)
+
+    def store(self, key, depth, score, flag, best_move):
+        if len(self.entries) >= self.max_entries and key not in self.entries:
+            self.entries.clear()
+        self.entries[key] = (depth, score, flag, best_move)
+
+    def clear(self):
+        self.entries.clear()
+
+
+class AI:
+
+    INFINITE = 10000000
+    DRAW = 0
+
+    # Shared by every search, including the ponder search, so the work done
+    # while pondering on a wrong guess is not thrown away.
+    transposition_table = TranspositionTable()
+
+    # alphabeta takes its moves from Board.generate_moves one at a time. False
+    # makes it build the full list with Board.get_possible_moves instead, which
+    # the move generation benchmark compares against.
+    lazy_move_generation = True
+    # With lazy_move_generation off, True orders the full list like
+    # Board.generate_moves does, so the benchmark can tell the effect of the
+    # capture ordering from the effect of the lazy generation.
+    order_full_move_list = False
+
+    # Number of nodes visited by alphabeta. Shared by all the searches of the
+    # process, so reset it before the search you want to count.
+    nodes = 0
+
+    @staticmethod
+    def get_ai_move(chessboard, invalid_moves, depth = 3, stop = None):
+        if invalid_moves is None:
+            invalid_moves = []
+        best_move, best_score = AI.get_best_move(chessboard, pieces.Piece.BLACK, depth, stop, invalid_moves)
+        if best_move is None:
+            # No legal move: checkmate or stalemate
+            return None
+
+        # Avoid moves that leave us in check
+        temp = board.Board.clone(chessboard)
+        temp.perform_move(best_move)
+        if temp.is_check(pieces.Piece.BLACK):
+            invalid_moves.append(best_move)
+            return AI.get_ai_move(chessboard, invalid_moves, depth, stop)
+
+        return best_move
+
+    # Searches the best move for the given color. Returns (best move, score),
+    # the move is None when the color has no legal move. Scores are from white's
+    # point of view like Heuristics.evaluate.
+    @staticmethod
+    def get_best_move(chessboard, color, depth, stop = None, invalid_moves = None):
+        maximizing = color == pieces.Piece.WHITE
+        # Generate and filter moves
+        moves = [m for m in chessboard.get_possible_moves(color)
+             if invalid_moves is None or not AI.is_invalid_move(m, invalid_moves)]
+        # Order moves by static evaluation (captures/threats prioritized)
+        def move_score(m):
+            temp = board.Board.clone(chessboard)
+            temp.perform_move(m)
+            return Heuristics.evaluate(temp)
+        moves.sort(key=lambda m: move_score(m), reverse=maximizing)
+
+        # The best move of an earlier search of this position goes first.
+        key = (chessboard.zobrist_key, maximizing)
+        entry = AI.transposition_table.probe(key)
+        if entry is not None:
+            AI.move_to_front(moves, entry[3])
+
+        best_move = None
+        best_score = -AI.INFINITE if maximizing else AI.INFINITE
+        alpha, beta = -AI.INFINITE, AI.INFINITE
+        # Search with alpha-beta
+        for move in moves:
+            copy = board.Board.clone(chessboard)
+            copy.perform_move(move)
+            score = AI.alphabeta(copy, depth-1, alpha, beta, not maximizing, stop)
+            if maximizing and score > best_score:
+                best_score = score
+                best_move = move
+                alpha = max(alpha, best_score)
+            elif not maximizing and score < best_score:
+                best_score = score
+                best_move = move
+                beta = min(beta, best_score)
+        if best_move is not None:
+            AI.transposition_table.store(key, depth, best_score, TranspositionTable.EXACT, best_move)
+        return best_move, best_score
+
+    # Searches depth 1, 2, ... max_depth and yields (depth, best move, score)
+    # after each completed depth. Each iteration orders its moves with what the
+    # previous ones left in the transposition table. Stops quietly when the stop
+    # event is set; the depth being searched at that moment is not yielded.
+    @staticmethod
+    def iterative_deepening(chessboard, color, max_depth, stop = None):
+        for depth in range(1, max_depth + 1):
+            try:
+                best_move, best_score = AI.get_best_move(chessboard, color, depth, stop)
+            except SearchAborted:
+                return
+            yield depth, best_move, best_score
+            if best_move is None:
+                return
+
+    # Iterative deepening up to max_depth, stopped after movetime seconds if
+    # given (None for no limit; 0 stops right after depth 1). Returns (depth,
+    # best move, score) of the deepest completed depth. Depth 1 is always
+    # completed so there is a move even when time is short.
+    @staticmethod
+    def search(chessboard, color, max_depth, movetime = None):
+        best_move, best_score = AI.get_best_move(chessboard, color, 1)
+        result = (1, best_move, best_score)
+        if best_move is None or max_depth <= 1:
+            return result
+
+        stop = threading.Event()
+        timer = None
+        if movetime is not None:
+            timer = threading.Timer(movetime, stop.set)
+            timer.start()
+        try:
+            for depth, best_move, best_score in AI.iterative_deepening(chessboard, color, max_depth, stop):
+                result = (depth, best_move, best_score)
+        finally:
+            if timer is not None:
+                timer.cancel()
+        return result
+
+    @staticmethod
+    def is_invalid_move(move, invalid_moves):
+        return any(inv.equals(move) for inv in invalid_moves)
+
+    # Moves the given move (if present) to the front of the list, in place.
+    @staticmethod
+    def move_to_front(moves, move):
+        if move is None:
+            return
+        for i in range(len(moves)):
+            if moves[i].equals(move):
+                moves.insert(0, moves.pop(i))
+                return
+
+    # Returns the moves of a search node, hash move first.
+    @staticmethod
+    def get_moves(node, color, hash_move):
+        if AI.lazy_move_generation:
+            return node.generate_moves(color, hash_move)
+        moves = node.get_possible_moves(color)
+        if AI.order_full_move_list:
+            moves = node.order_moves(moves)
+        AI.move_to_front(moves, hash_move)
+        return moves
+
+    @staticmethod
+    def alphabeta(node, depth, alpha, beta, maximizing, stop = None):
+        if stop is not None and stop.is_set():
+            raise SearchAborted()
+        AI.nodes += 1
+
+        # A repeated position is scored as a draw: if it was good for one side,
+        # the other can repeat it again.
+        if node.is_repetition() or node.is_fifty_move_draw():
+            return AI.DRAW
+
+        key = (node.zobrist_key, maximizing)
+        entry = AI.transposition_table.probe(key)
+        hash_move = None
+        if entry is not None:
+            entry_depth, entry_score, entry_flag, hash_move = entry
+            if entry_depth >= depth:
+                if entry_flag == TranspositionTable.EXACT:
+                    return entry_score
+                if entry_flag == TranspositionTable.LOWER and entry_score >= beta:
+                    return entry_score
+                if entry_flag == TranspositionTable.UPPER and entry_score <= alpha:
+                    return entry_score
+
+        if depth == 0:
+            return Heuristics.evaluate(node)
+
+        alpha_orig, beta_orig = alpha, beta
+        best_move = None
+        if maximizing:
+            best_eval = -AI.INFINITE
+            for m in AI.get_moves(node, pieces.Piece.WHITE, hash_move):
+                child = board.Board.clone(node)
+                child.perform_move(m)
+                eval = AI.alphabeta(child, depth-1, alpha, beta, False, stop)
+                if eval > best_eval:
+                    best_eval = eval
+                    best_move = m
+                alpha = max(alpha, eval)
+                if beta <= alpha:
+                    break
+        else:
+            best_eval = AI.INFINITE
+            for m in AI.get_moves(node, pieces.Piece.BLACK, hash_move):
+                child = board.Board.clone(node)
+                child.perform_move(m)
+                eval = AI.alphabeta(child, depth-1, alpha, beta, True, stop)
+                if eval < best_eval:
+                    best_eval = eval
+                    best_move = m
+                beta = min(beta, eval)
+                if beta <= alpha:
+                    break
+
+        if best_eval <= alpha_orig:
+            flag = TranspositionTable.UPPER
+        elif best_eval >= beta_orig:
+            flag = TranspositionTable.LOWER
+        else:
+            flag = TranspositionTable.EXACT
+        AI.transposition_table.store(key, depth, best_eval, flag, best_move)
+        return best_eval
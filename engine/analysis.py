@@ -0,0 +1,204 @@
+import json, multiprocessing, os, signal, sys, time
+from collections import deque
+from itertools import islice
+from . import notation
+from .ai import AI
+
+# Offline analysis of many positions. Positions are read lazily from EPD or PGN
+# files and searched by a pool of worker processes. Every worker keeps its
+# transposition table between positions, so positions from the same game help
+# each other. Results are written as JSON lines in input order as soon as they
+# are known, and at most a few positions per worker are in flight at any time,
+# so memory stays bounded whatever the size of the input.
+#
+# The output file doubles as the checkpoint: with resume, the positions that
+# already have a line in it are skipped and the new results are appended.
+
+
+# Yields (id, fen, keys) for every position of an EPD file. The id is taken
+# from the "id" opcode when present, else it is the line number. EPD has no
+# history, so keys is None. A line that cannot be read is skipped, with a
+# warning on stderr; the FEN itself is only checked by the worker.
+def read_epd(path):
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                fen, operations = notation.parse_epd(line)
+            except notation.NotationError as e:
+                print(f"{path}:{line_number}: {e}, skipping the line", file=sys.stderr)
+                continue
+            yield operations.get("id", [str(line_number)])[0], fen, None
+
+
+# Yields (id, fen, keys) for the position after every move of every game in a
+# PGN file, ids are "<game>.<ply>" and keys are the Board.recent_keys of the
+# position, so the search sees the repetitions of the game. A game with a move
+# that cannot be read is cut short at that move, with a warning on stderr.
+def read_pgn(path):
+    for game_number, (tags, movetext) in enumerate(read_pgn_games(path), 1):
+        chessboard, color = notation.parse_fen(tags.get("FEN", notation.START_FEN))
+        for ply, san in enumerate(pgn_moves(movetext), 1):
+            try:
+                move = notation.parse_san(chessboard, color, san)
+            except notation.NotationError as e:
+                print(f"{path}: game {game_number}: {e}, skipping the rest of the game", file=sys.stderr)
+                break
+            chessboard.perform_move(move)
+            color = notation.other_color(color)
+            yield f"{game_number}.{ply}", notation.to_fen(chessboard, color), chessboard.recent_keys()
+
+
+# Yields (tags, movetext) for every game of a PGN file, one game at a time.
+def read_pgn_games(path):
+    tags = {}
+    movetext = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("["):
+                if movetext:
+                    yield tags, " ".join(movetext)
+                    tags, movetext = {}, []
+                name, _, value = line[1:-1].partition(" ")
+                tags[name] = value.strip().strip('"')
+            elif line and not line.startswith("%"):
+                movetext.append(line)
+    if movetext:
+        yield tags, " ".join(movetext)
+
+
+# Returns the SAN moves of a movetext, without comments, variations, move
+# numbers, annotations and the result.
+def pgn_moves(movetext):
+    moves = []
+    depth = 0
+    comment = False
+    token = ""
+    for char in movetext + " ":
+        if comment:
+            comment = char != "}"
+        elif char == "{":
+            comment = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif depth == 0 and not char.isspace():
+            token += char
+            continue
+        if token:
+            moves.append(token)
+            token = ""
+    result = []
+    for token in moves:
+        token = token.split(".")[-1]
+        if not token or token.startswith("$") or token in ("1-0", "0-1", "1/2-1/2", "*"):
+            continue
+        result.append(token)
+    return result
+
+
+def read_positions(path):
+    if path.lower().endswith(".pgn"):
+        return read_pgn(path)
+    return read_epd(path)
+
+
+# Worker process state: the search settings. The transposition table is the
+# class level one of AI, which lives as long as the worker does.
+worker_settings = {}
+
+
+def init_worker(depth, movetime):
+    # Ctrl-C is handled by the parent, which stops the pool.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    worker_settings["depth"] = depth
+    worker_settings["movetime"] = movetime
+
+
+# Searches one position and returns its result as a dict. With a movetime the
+# result of the deepest depth completed in time is returned. An invalid FEN
+# gives a result with an "error" instead, so the output keeps one line per
+# input position.
+def analyse_position(job):
+    index, position_id, fen, keys = job
+    try:
+        chessboard, color = notation.parse_fen(fen)
+    except notation.NotationError as e:
+        return {"index": index, "id": position_id, "fen": fen, "error": str(e)}
+    if keys is not None:
+        chessboard.restore_history(keys)
+    AI.nodes = 0
+    start = time.perf_counter()
+    depth, best_move, score = AI.search(chessboard, color, worker_settings["depth"], worker_settings["movetime"])
+    return {
+        "index": index,
+        "id": position_id,
+        "fen": fen,
+        "best_move": notation.move_to_uci(best_move) if best_move is not None else None,
+        "score": score if best_move is not None else None,
+        "depth": depth,
+        "nodes": AI.nodes,
+        "time": round(time.perf_counter() - start, 4),
+    }
+
+
+# Returns the number of complete result lines in the output file, dropping a
+# partly written last line left by an interrupted run.
+def count_done(output):
+    if not os.path.exists(output):
+        return 0
+    with open(output, "rb+") as f:
+        data = f.read()
+        complete = data.rfind(b"\n") + 1
+        if complete != len(data):
+            f.truncate(complete)
+    return data[:complete].count(b"\n")
+
+
+def write_result(out, result):
+    if "error" in result:
+        print(f"{result['id']}: {result['error']}", file=sys.stderr)
+    out.write(json.dumps(result) + "\n")
+    out.flush()
+
+
+# Analyses every position of the input file into the output file. Returns the
+# number of positions analysed by this run.
+def analyse_file(path, output, workers = None, depth = 3, movetime = None, resume = False):
+    workers = workers or os.cpu_count() or 1
+    done = count_done(output) if resume else 0
+    positions = islice(enumerate(read_positions(path)), done, None)
+    jobs = ((index, position_id, fen, keys) for index, (position_id, fen, keys) in positions)
+    max_pending = workers * 2
+
+    analysed = 0
+    pool = multiprocessing.Pool(workers, init_worker, (depth, movetime))
+    try:
+        with open(output, "a" if resume else "w") as out:
+            pending = deque()
+            try:
+                for job in jobs:
+                    pending.append(pool.apply_async(analyse_position, (job,)))
+                    if len(pending) >= max_pending:
+                        write_result(out, pending.popleft().get())
+                        analysed += 1
+            except Exception:
+                # Keep the results of the positions read before the error, so
+                # that a resumed run starts after them.
+                while pending:
+                    write_result(out, pending.popleft().get())
+                raise
+            while pending:
+                write_result(out, pending.popleft().get())
+                analysed += 1
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+    return analysed
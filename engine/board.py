@@ -0,0 +1,293 @@
+from . import pieces, zobrist
+from .move import Move
+
+class Board:
+
+    WIDTH = 8
+    HEIGHT = 8
+
+    def __init__(self, chesspieces, white_king_moved, black_king_moved, zobrist_key=None, pawn_key=None):
+        self.chesspieces = chesspieces
+        self.white_king_moved = white_king_moved
+        self.black_king_moved = black_king_moved
+        self.en_passant_target = None  # To support en passant
+        # Zobrist key of the position, kept up to date by perform_move.
+        if zobrist_key is None:
+            zobrist_key = zobrist.hash_board(self)
+        self.zobrist_key = zobrist_key
+        # Zobrist key of the pawns only, for the pawn hash table.
+        if pawn_key is None:
+            pawn_key = zobrist.hash_pawns(self)
+        self.pawn_key = pawn_key
+        # Keys of the earlier positions of the game, most recent first, as a
+        # chain of (key, older entries) pairs ending in None. Clones share the
+        # chain, so pushing a position is O(1) whatever the game length.
+        self.history = None
+        # Plies since the last capture or pawn move, for the fifty-move rule.
+        # Positions before that cannot repeat, so it also bounds the
+        # repetition scan.
+        self.halfmove_clock = 0
+
+    @classmethod
+    def clone(cls, chessboard):
+        chesspieces = [[0 for x in range(Board.WIDTH)] for y in range(Board.HEIGHT)]
+        for x in range(Board.WIDTH):
+            for y in range(Board.HEIGHT):
+                piece = chessboard.chesspieces[x][y]
+                if piece != 0:
+                    chesspieces[x][y] = piece.clone()
+        new_board = cls(chesspieces, chessboard.white_king_moved, chessboard.black_king_moved,
+                        chessboard.zobrist_key, chessboard.pawn_key)
+        new_board.en_passant_target = chessboard.en_passant_target
+        new_board.history = chessboard.history
+        new_board.halfmove_clock = chessboard.halfmove_clock
+        return new_board
+
+    @classmethod
+    def new(cls):
+        chess_pieces = [[0 for x in range(Board.WIDTH)] for y in range(Board.HEIGHT)]
+        for x in range(Board.WIDTH):
+            chess_pieces[x][Board.HEIGHT-2] = pieces.Pawn(x, Board.HEIGHT-2, pieces.Piece.WHITE)
+            chess_pieces[x][1] = pieces.Pawn(x, 1, pieces.Piece.BLACK)
+
+        chess_pieces[0][Board.HEIGHT-1] = pieces.Rook(0, Board.HEIGHT-1, pieces.Piece.WHITE)
+        chess_pieces[Board.WIDTH-1][Board.HEIGHT-1] = pieces.Rook(Board.WIDTH-1, Board.HEIGHT-1, pieces.Piece.WHITE)
+        chess_pieces[0][0] = pieces.Rook(0, 0, pieces.Piece.BLACK)
+        chess_pieces[Board.WIDTH-1][0] = pieces.Rook(Board.WIDTH-1, 0, pieces.Piece.BLACK)
+
+        chess_pieces[1][Board.HEIGHT-1] = pieces.Knight(1, Board.HEIGHT-1, pieces.Piece.WHITE)
+        chess_pieces[Board.WIDTH-2][Board.HEIGHT-1] = pieces.Knight(Board.WIDTH-2, Board.HEIGHT-1, pieces.Piece.WHITE)
+        chess_pieces[1][0] = pieces.Knight(1, 0, pieces.Piece.BLACK)
+        chess_pieces[Board.WIDTH-2][0] = pieces.Knight(Board.WIDTH-2, 0, pieces.Piece.BLACK)
+
+        chess_pieces[2][Board.HEIGHT-1] = pieces.Bishop(2, Board.HEIGHT-1, pieces.Piece.WHITE)
+        chess_pieces[Board.WIDTH-3][Board.HEIGHT-1] = pieces.Bishop(Board.WIDTH-3, Board.HEIGHT-1, pieces.Piece.WHITE)
+        chess_pieces[2][0] = pieces.Bishop(2, 0, pieces.Piece.BLACK)
+        chess_pieces[Board.WIDTH-3][0] = pieces.Bishop(Board.WIDTH-3, 0, pieces.Piece.BLACK)
+
+        chess_pieces[4][Board.HEIGHT-1] = pieces.King(4, Board.HEIGHT-1, pieces.Piece.WHITE)
+        chess_pieces[3][Board.HEIGHT-1] = pieces.Queen(3, Board.HEIGHT-1, pieces.Piece.WHITE)
+        chess_pieces[4][0] = pieces.King(4, 0, pieces.Piece.BLACK)
+        chess_pieces[3][0] = pieces.Queen(3, 0, pieces.Piece.BLACK)
+
+        return cls(chess_pieces, False, False)
+
+    def get_possible_moves(self, color):
+        moves = []
+        for x in range(Board.WIDTH):
+            for y in range(Board.HEIGHT):
+                piece = self.chesspieces[x][y]
+                if piece != 0 and piece.color == color:
+                    for move in piece.get_possible_moves(self):
+                        Board.generated_moves += 1
+                        if self.is_legal(move, color):
+                            moves.append(move)
+        return moves
+
+    # Number of pseudo-legal moves built by get_possible_moves and
+    # generate_moves, and of legality checks (is_legal), for the move
+    # generation benchmark.
+    generated_moves = 0
+    legality_checks = 0
+
+    # Yields the legal moves of the color in stages: the hash move, then the
+    # captures (most valuable victim first, then least valuable attacker), then
+    # the quiet moves. A stage is only generated once the previous one is used
+    # up and legality is only checked for the moves actually yielded, so a
+    # search that cuts off on an early move never pays for the rest.
+    def generate_moves(self, color, hash_move=None):
+        if hash_move is not None:
+            # The hash move may come from another position with the same key.
+            piece = self.get_piece(hash_move.xfrom, hash_move.yfrom)
+            candidates = piece.get_possible_moves(self) if piece != 0 and piece.color == color else []
+            Board.generated_moves += len(candidates)
+            if any(m.equals(hash_move) for m in candidates) and self.is_legal(hash_move, color):
+                yield hash_move
+            else:
+                hash_move = None
+
+        own_pieces = [piece for column in self.chesspieces for piece in column if piece != 0 and piece.color == color]
+
+        captures = []
+        for piece in own_pieces:
+            for move in piece.get_possible_captures(self):
+                captures.append((-self.chesspieces[move.xto][move.yto].value, piece.value, move))
+        Board.generated_moves += len(captures)
+        captures.sort(key=lambda capture: capture[:2])
+        for victim, attacker, move in captures:
+            if (hash_move is None or not move.equals(hash_move)) and self.is_legal(move, color):
+                yield move
+
+        quiet_moves = []
+        for piece in own_pieces:
+            quiet_moves.extend(piece.get_possible_quiet_moves(self))
+        Board.generated_moves += len(quiet_moves)
+        for move in quiet_moves:
+            if (hash_move is None or not move.equals(hash_move)) and self.is_legal(move, color):
+                yield move
+
+    # Returns the moves in the order of generate_moves: the captures, most
+    # valuable victim first, then least valuable attacker, then the quiet moves.
+    def order_moves(self, moves):
+        captures = [m for m in moves if self.chesspieces[m.xto][m.yto] != 0]
+        captures.sort(key=lambda m: (-self.chesspieces[m.xto][m.yto].value, self.chesspieces[m.xfrom][m.yfrom].value))
+        return captures + [m for m in moves if self.chesspieces[m.xto][m.yto] == 0]
+
+    # Returns whether the pseudo-legal move does not leave the color in check.
+    def is_legal(self, move, color):
+        Board.legality_checks += 1
+        copy = Board.clone(self)
+        copy.perform_move(move)
+        return not copy.is_check(color)
+
+    def perform_move(self, move: Move):
+        piece = self.chesspieces[move.xfrom][move.yfrom]
+
+        # History: captures and pawn moves cannot be undone, so no earlier
+        # position can come back after them.
+        self.history = (self.zobrist_key, self.history)
+        if isinstance(piece, pieces.Pawn) or self.chesspieces[move.xto][move.yto] != 0:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+
+        # En passant capture
+        if isinstance(piece, pieces.Pawn) and self.en_passant_target == (move.xto, move.yto):
+            captured = self.chesspieces[move.xto][move.yfrom]
+            if captured != 0:
+                self.zobrist_key ^= zobrist.piece_key(captured, move.xto, move.yfrom)
+                self.pawn_key ^= zobrist.piece_key(captured, move.xto, move.yfrom)
+            self.chesspieces[move.xto][move.yfrom] = 0
+
+        # Move piece
+        self.move_piece(piece, move.xto, move.yto)
+
+        # Pawn promotion
+        if isinstance(piece, pieces.Pawn) and (piece.y == 0 or piece.y == Board.HEIGHT-1):
+            queen = pieces.Queen(piece.x, piece.y, piece.color)
+            self.zobrist_key ^= zobrist.piece_key(piece, piece.x, piece.y) ^ zobrist.piece_key(queen, piece.x, piece.y)
+            self.pawn_key ^= zobrist.piece_key(piece, piece.x, piece.y)
+            self.chesspieces[piece.x][piece.y] = queen
+
+        # Set en passant target
+        self.zobrist_key ^= zobrist.en_passant_key(self.en_passant_target)
+        if isinstance(piece, pieces.Pawn) and abs(move.yto - move.yfrom) == 2:
+            self.en_passant_target = (piece.x, (move.yto + move.yfrom)//2)
+        else:
+            self.en_passant_target = None
+        self.zobrist_key ^= zobrist.en_passant_key(self.en_passant_target)
+
+        # Castling: handle rook
+        if isinstance(piece, pieces.King):
+            # mark king moved
+            if piece.color == pieces.Piece.WHITE:
+                if not self.white_king_moved:
+                    self.zobrist_key ^= zobrist.WHITE_KING_MOVED
+                self.white_king_moved = True
+            else:
+                if not self.black_king_moved:
+                    self.zobrist_key ^= zobrist.BLACK_KING_MOVED
+                self.black_king_moved = True
+
+            dx = move.xto - move.xfrom
+            if dx == 2:  # kingside
+                rook = self.chesspieces[move.xto+1][move.yto]
+                self.move_piece(rook, move.xto-1, move.yto)
+            elif dx == -2:  # queenside
+                rook = self.chesspieces[move.xto-2][move.yto]
+                self.move_piece(rook, move.xto+1, move.yto)
+
+    # Returns whether the current position already occurred `count` times
+    # before, with the same side to move: an even number of plies back. Only
+    # the last halfmove_clock plies are scanned.
+    def is_repetition(self, count=1):
+        seen = 0
+        entry = self.history
+        for ply in range(1, self.halfmove_clock + 1):
+            if entry is None:
+                break
+            key, entry = entry
+            if ply % 2 == 0 and key == self.zobrist_key:
+                seen += 1
+                if seen >= count:
+                    return True
+        return False
+
+    # Returns the keys of the positions since the last capture or pawn move,
+    # oldest first and this position last: the part of the history that
+    # is_repetition can use, for boards rebuilt from FEN in another process.
+    def recent_keys(self):
+        keys = [self.zobrist_key]
+        entry = self.history
+        for ply in range(self.halfmove_clock):
+            if entry is None:
+                break
+            key, entry = entry
+            keys.append(key)
+        keys.reverse()
+        return keys
+
+    # Rebuilds the history from the keys of recent_keys. A board parsed from
+    # FEN can have another key than the board the keys were taken from, since
+    # FEN only has castling rights where the board has the king-moved flags;
+    # the difference with the last key is applied to the older keys too.
+    def restore_history(self, keys):
+        difference = self.zobrist_key ^ keys[-1]
+        self.history = None
+        for key in keys[:-1]:
+            self.history = (key ^ difference, self.history)
+
+    # Returns whether fifty moves (a hundred plies) went by without a capture
+    # or a pawn move.
+    def is_fifty_move_draw(self):
+        return self.halfmove_clock >= 100
+
+    def move_piece(self, piece, xto, yto):
+        captured = self.chesspieces[xto][yto]
+        if captured != 0:
+            self.zobrist_key ^= zobrist.piece_key(captured, xto, yto)
+            if captured.piece_type == pieces.Pawn.PIECE_TYPE:
+                self.pawn_key ^= zobrist.piece_key(captured, xto, yto)
+        moved = zobrist.piece_key(piece, piece.x, piece.y) ^ zobrist.piece_key(piece, xto, yto)
+        self.zobrist_key ^= moved
+        if piece.piece_type == pieces.Pawn.PIECE_TYPE:
+            self.pawn_key ^= moved
+        self.chesspieces[piece.x][piece.y] = 0
+        piece.x = xto
+        piece.y = yto
+        self.chesspieces[xto][yto] = piece
+
+    def is_check(self, color):
+        other_color = pieces.Piece.BLACK if color == pieces.Piece.WHITE else pieces.Piece.WHITE
+
+        for x in range(Board.WIDTH):
+            for y in range(Board.HEIGHT):
+                attacker = self.chesspieces[x][y]
+                if attacker != 0 and attacker.color == other_color:
+                    for move in attacker.get_possible_moves(self):
+                        if self.get_piece(move.xto, move.yto) != 0 and self.get_piece(move.xto, move.yto).piece_type == pieces.King.PIECE_TYPE:
+                            if self.get_piece(move.xto, move.yto).color == color:
+                                return True
+        return False
+
+    def get_piece(self, x, y):
+        if not self.in_bounds(x, y):
+            return 0
+        return self.chesspieces[x][y]
+
+    def in_bounds(self, x, y):
+        return 0 <= x < Board.WIDTH and 0 <= y < Board.HEIGHT
+
+    def to_string(self):
+        string = "    A  B  C  D  E  F  G  H\n"
+        string += "    -----------------------\n"
+        for y in range(Board.HEIGHT):
+            string += str(8 - y) + " | "
+            for x in range(Board.WIDTH):
+                piece = self.chesspieces[x][y]
+                if piece != 0:
+                    string += piece.to_string()
+                else:
+                    string += ".. "
+            string += "\n"
+        return string + "\n"
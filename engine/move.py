@@ -14,7 +14,6 @@ class Move:
 
     # Thêm __eq__ an toàn:
     def __eq__(self, other):
-        from move import Move
         if not isinstance(other, Move):
             return False
         return self.equals(other)
@@ -0,0 +1,201 @@
+from . import pieces, zobrist
+from .board import Board
+
+# Conversions between the engine's objects and the usual chess notations.
+# On the board x is the file (0 is the a-file) and y is the row from the top,
+# so y = 0 is rank 8 and y = 7 is rank 1.
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+class NotationError(ValueError):
+    pass
+
+
+def square_name(x, y):
+    return "abcdefgh"[x] + str(8 - y)
+
+
+def parse_square(name):
+    if len(name) != 2 or name[0] not in "abcdefgh" or name[1] not in "12345678":
+        raise NotationError(f"invalid square: {name!r}")
+    return "abcdefgh".index(name[0]), 8 - int(name[1])
+
+
+def other_color(color):
+    return pieces.Piece.BLACK if color == pieces.Piece.WHITE else pieces.Piece.WHITE
+
+
+# Returns (board, color to move) for a FEN string. The last two fields
+# (move counters) are optional so the four fields of an EPD line work too.
+# The halfmove clock is kept, the fullmove number is ignored.
+# The board only knows whether each king has moved, so a side without any
+# castling right is treated as if its king had moved.
+def parse_fen(fen):
+    fields = fen.split()
+    if len(fields) < 4:
+        raise NotationError(f"invalid FEN: {fen!r}")
+    placement, side, castling, en_passant = fields[:4]
+
+    rows = placement.split("/")
+    if len(rows) != 8:
+        raise NotationError(f"invalid FEN placement: {placement!r}")
+    chesspieces = [[0 for x in range(Board.WIDTH)] for y in range(Board.HEIGHT)]
+    for y, row in enumerate(rows):
+        x = 0
+        for char in row:
+            if char.isdigit():
+                x += int(char)
+                continue
+            piece_class = pieces.PIECE_CLASSES.get(char.upper())
+            if piece_class is None or x > 7:
+                raise NotationError(f"invalid FEN placement: {placement!r}")
+            color = pieces.Piece.WHITE if char.isupper() else pieces.Piece.BLACK
+            chesspieces[x][y] = piece_class(x, y, color)
+            x += 1
+        if x != 8:
+            raise NotationError(f"invalid FEN placement: {placement!r}")
+
+    if side not in ("w", "b"):
+        raise NotationError(f"invalid FEN side to move: {side!r}")
+    white_king_moved = "K" not in castling and "Q" not in castling
+    black_king_moved = "k" not in castling and "q" not in castling
+    chessboard = Board(chesspieces, white_king_moved, black_king_moved)
+    if len(fields) > 4:
+        if not fields[4].isdigit():
+            raise NotationError(f"invalid FEN halfmove clock: {fields[4]!r}")
+        chessboard.halfmove_clock = int(fields[4])
+    if en_passant != "-":
+        chessboard.en_passant_target = parse_square(en_passant)
+        # The key was computed without the target in the constructor.
+        chessboard.zobrist_key ^= zobrist.en_passant_key(chessboard.en_passant_target)
+
+    color = pieces.Piece.WHITE if side == "w" else pieces.Piece.BLACK
+    return chessboard, color
+
+
+# Splits an EPD line into (fen, operations). The fen is the four position
+# fields, operations maps each opcode to its list of operands, with the quotes
+# of string operands removed: 'bm Qg6 Rf7; id "WAC.001";' gives
+# {"bm": ["Qg6", "Rf7"], "id": ["WAC.001"]}.
+def parse_epd(line):
+    fields = line.split(None, 4)
+    if len(fields) < 4:
+        raise NotationError(f"invalid EPD: {line!r}")
+    operations = {}
+    operation = []
+    token = None
+    quoted = False
+    for char in (fields[4] if len(fields) > 4 else "") + ";":
+        if quoted:
+            if char == '"':
+                quoted = False
+            else:
+                token += char
+            continue
+        if char == '"':
+            quoted = True
+            token = token or ""
+        elif char.isspace() or char == ";":
+            if token is not None:
+                operation.append(token)
+                token = None
+            if char == ";" and operation:
+                operations[operation[0]] = operation[1:]
+                operation = []
+        else:
+            token = (token or "") + char
+    return " ".join(fields[:4]), operations
+
+
+def to_fen(chessboard, color):
+    rows = []
+    for y in range(Board.HEIGHT):
+        row = ""
+        empty = 0
+        for x in range(Board.WIDTH):
+            piece = chessboard.chesspieces[x][y]
+            if piece == 0:
+                empty += 1
+                continue
+            if empty:
+                row += str(empty)
+                empty = 0
+            row += piece.piece_type if piece.color == pieces.Piece.WHITE else piece.piece_type.lower()
+        if empty:
+            row += str(empty)
+        rows.append(row)
+
+    castling = ""
+    for king_moved, rank_y, symbols in ((chessboard.white_king_moved, 7, "KQ"), (chessboard.black_king_moved, 0, "kq")):
+        if king_moved:
+            continue
+        for rook_x, symbol in ((7, symbols[0]), (0, symbols[1])):
+            rook = chessboard.get_piece(rook_x, rank_y)
+            if rook != 0 and rook.piece_type == pieces.Rook.PIECE_TYPE:
+                castling += symbol
+
+    en_passant = "-"
+    if chessboard.en_passant_target is not None:
+        en_passant = square_name(*chessboard.en_passant_target)
+    side = "w" if color == pieces.Piece.WHITE else "b"
+    return f"{'/'.join(rows)} {side} {castling or '-'} {en_passant} {chessboard.halfmove_clock} 1"
+
+
+def move_to_uci(move):
+    return square_name(move.xfrom, move.yfrom) + square_name(move.xto, move.yto)
+
+
+# Returns the legal move of the color that matches the given UCI string, e.g.
+# "e2e4" or "e7e8q". The promotion piece is ignored, pawns always become queens.
+# The legal moves of the position can be passed when they are already known.
+def parse_uci(chessboard, color, uci, legal_moves = None):
+    if len(uci) not in (4, 5):
+        raise NotationError(f"invalid move: {uci!r}")
+    xfrom, yfrom = parse_square(uci[0:2])
+    xto, yto = parse_square(uci[2:4])
+    if legal_moves is None:
+        legal_moves = chessboard.get_possible_moves(color)
+    for move in legal_moves:
+        if move.xfrom == xfrom and move.yfrom == yfrom and move.xto == xto and move.yto == yto:
+            return move
+    raise NotationError(f"illegal move: {uci!r}")
+
+
+# Returns the legal move of the color that matches the given SAN string,
+# e.g. "e4", "Nbd7", "exd5", "O-O", "e8=Q+". Pawns always promote to a queen
+# in this engine, so the promotion piece is not checked.
+def parse_san(chessboard, color, san):
+    text = san.rstrip("+#!?")
+    legal_moves = chessboard.get_possible_moves(color)
+
+    if text in ("O-O", "0-0", "O-O-O", "0-0-0"):
+        dx = 2 if text in ("O-O", "0-0") else -2
+        for move in legal_moves:
+            piece = chessboard.get_piece(move.xfrom, move.yfrom)
+            if piece.piece_type == pieces.King.PIECE_TYPE and move.xto - move.xfrom == dx:
+                return move
+        raise NotationError(f"illegal move: {san!r}")
+
+    if "=" in text:
+        text = text[:text.index("=")]
+    piece_type = pieces.Pawn.PIECE_TYPE
+    if text and text[0] in "KQRBN":
+        piece_type = text[0]
+        text = text[1:]
+    text = text.replace("x", "")
+    if len(text) < 2:
+        raise NotationError(f"invalid move: {san!r}")
+    xto, yto = parse_square(text[-2:])
+    hint = text[:-2]
+
+    matches = []
+    for move in legal_moves:
+        piece = chessboard.get_piece(move.xfrom, move.yfrom)
+        if piece.piece_type != piece_type or move.xto != xto or move.yto != yto:
+            continue
+        from_square = square_name(move.xfrom, move.yfrom)
+        if all(char in from_square for char in hint):
+            matches.append(move)
+    if len(matches) != 1:
+        raise NotationError(f"{'ambiguous' if matches else 'illegal'} move: {san!r}")
+    return matches[0]
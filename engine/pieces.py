@@ -1,5 +1,4 @@
-import ai
-from move import Move
+from .move import Move
 
 class Piece():
 
@@ -111,9 +110,62 @@ class Piece():
                 move = Move(self.x, self.y, xto, yto)
         return move
 
+    # Directions of the sliding pieces as (dx, dy), in the order of
+    # get_possible_diagonal_moves and get_possible_horizontal_moves.
+    DIAGONALS = ((1, 1), (1, -1), (-1, -1), (-1, 1))
+    STRAIGHTS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+    # The captures and quiet moves below are the two halves of
+    # get_possible_moves, built separately for the staged move generation of
+    # Board.generate_moves, so that a search that cuts off on a capture never
+    # builds the quiet moves. Every piece implements get_possible_captures and
+    # get_possible_quiet_moves with them.
+
+    # Returns the captures along the rays: the first piece met on each ray,
+    # if it is of the other color.
+    def get_ray_captures(self, board, directions):
+        moves = []
+        for dx, dy in directions:
+            x, y = self.x + dx, self.y + dy
+            while board.in_bounds(x, y):
+                piece = board.chesspieces[x][y]
+                if (piece != 0):
+                    if (piece.color != self.color):
+                        moves.append(Move(self.x, self.y, x, y))
+                    break
+                x, y = x + dx, y + dy
+        return moves
+
+    # Returns the moves to the empty squares along the rays, up to the first
+    # piece met.
+    def get_ray_quiet_moves(self, board, directions):
+        moves = []
+        for dx, dy in directions:
+            x, y = self.x + dx, self.y + dy
+            while board.in_bounds(x, y) and board.chesspieces[x][y] == 0:
+                moves.append(Move(self.x, self.y, x, y))
+                x, y = x + dx, y + dy
+        return moves
+
+    # Returns the captures among the squares at the given offsets.
+    def get_step_captures(self, board, offsets):
+        moves = []
+        for dx, dy in offsets:
+            piece = board.get_piece(self.x + dx, self.y + dy)
+            if (piece != 0 and piece.color != self.color):
+                moves.append(Move(self.x, self.y, self.x + dx, self.y + dy))
+        return moves
+
+    # Returns the moves to the empty squares among the given offsets.
+    def get_step_quiet_moves(self, board, offsets):
+        moves = []
+        for dx, dy in offsets:
+            if (board.in_bounds(self.x + dx, self.y + dy) and board.chesspieces[self.x + dx][self.y + dy] == 0):
+                moves.append(Move(self.x, self.y, self.x + dx, self.y + dy))
+        return moves
+
     # Returns the list of moves cleared of all the 0's.
     def remove_null_from_list(self, l):
-        from move import Move
         return [m for m in l if isinstance(m, Move)]
 
     def to_string(self):
@@ -130,6 +182,12 @@ class Rook(Piece):
     def get_possible_moves(self, board):
         return self.get_possible_horizontal_moves(board)
 
+    def get_possible_captures(self, board):
+        return self.get_ray_captures(board, Piece.STRAIGHTS)
+
+    def get_possible_quiet_moves(self, board):
+        return self.get_ray_quiet_moves(board, Piece.STRAIGHTS)
+
     def clone(self):
         return Rook(self.x, self.y, self.color)
 
@@ -138,6 +196,7 @@ class Knight(Piece):
 
     PIECE_TYPE = "N"
     VALUE = 320
+    OFFSETS = ((2, 1), (-1, 2), (-2, 1), (1, -2), (2, -1), (1, 2), (-2, -1), (-1, -2))
 
     def __init__(self, x, y, color):
         super(Knight, self).__init__(x, y, color, Knight.PIECE_TYPE, Knight.VALUE)
@@ -156,6 +215,12 @@ class Knight(Piece):
 
         return self.remove_null_from_list(moves)
 
+    def get_possible_captures(self, board):
+        return self.get_step_captures(board, Knight.OFFSETS)
+
+    def get_possible_quiet_moves(self, board):
+        return self.get_step_quiet_moves(board, Knight.OFFSETS)
+
     def clone(self):
         return Knight(self.x, self.y, self.color)
 
@@ -171,6 +236,12 @@ class Bishop(Piece):
     def get_possible_moves(self, board):
         return self.get_possible_diagonal_moves(board)
 
+    def get_possible_captures(self, board):
+        return self.get_ray_captures(board, Piece.DIAGONALS)
+
+    def get_possible_quiet_moves(self, board):
+        return self.get_ray_quiet_moves(board, Piece.DIAGONALS)
+
     def clone(self):
         return Bishop(self.x, self.y, self.color)
 
@@ -188,6 +259,12 @@ class Queen(Piece):
         horizontal = self.get_possible_horizontal_moves(board)
         return horizontal + diagonal
 
+    def get_possible_captures(self, board):
+        return self.get_ray_captures(board, Piece.STRAIGHTS + Piece.DIAGONALS)
+
+    def get_possible_quiet_moves(self, board):
+        return self.get_ray_quiet_moves(board, Piece.STRAIGHTS + Piece.DIAGONALS)
+
     def clone(self):
         return Queen(self.x, self.y, self.color)
 
@@ -196,6 +273,7 @@ class King(Piece):
 
     PIECE_TYPE = "K"
     VALUE = 20000
+    OFFSETS = ((1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1))
 
     def __init__(self, x, y, color):
         super(King, self).__init__(x, y, color, King.PIECE_TYPE, King.VALUE)
@@ -217,6 +295,16 @@ class King(Piece):
 
         return self.remove_null_from_list(moves)
 
+    def get_possible_captures(self, board):
+        return self.get_step_captures(board, King.OFFSETS)
+
+    # Castling is a quiet move.
+    def get_possible_quiet_moves(self, board):
+        moves = self.get_step_quiet_moves(board, King.OFFSETS)
+        moves.append(self.get_castle_kingside_move(board))
+        moves.append(self.get_castle_queenside_move(board))
+        return self.remove_null_from_list(moves)
+
     # Only checks for castle kingside
     def get_castle_kingside_move(self, board):
         # Are we looking at a valid rook
@@ -283,13 +371,18 @@ class Pawn(Piece):
         else:
             return self.y == 8 - 2
 
+    # Direction the pawn can move in.
+    def get_direction(self):
+        if (self.color == Piece.BLACK):
+            return 1
+        return -1
+
     def get_possible_moves(self, board):
-        moves = []
+        return self.get_possible_quiet_moves(board) + self.get_possible_captures(board)
 
-        # Direction the pawn can move in.
-        direction = -1
-        if (self.color == Piece.BLACK):
-            direction = 1
+    def get_possible_quiet_moves(self, board):
+        moves = []
+        direction = self.get_direction()
 
         # The general 1 step forward move.
         if (board.get_piece(self.x, self.y+direction) == 0):
@@ -299,6 +392,12 @@ class Pawn(Piece):
         if (self.is_starting_position() and board.get_piece(self.x, self.y+ direction) == 0 and board.get_piece(self.x, self.y + direction*2) == 0):
             moves.append(self.get_move(board, self.x, self.y + direction * 2))
 
+        return self.remove_null_from_list(moves)
+
+    def get_possible_captures(self, board):
+        moves = []
+        direction = self.get_direction()
+
         # Eating pieces.
         piece = board.get_piece(self.x + 1, self.y + direction)
         if (piece != 0):
@@ -312,3 +411,14 @@ class Pawn(Piece):
 
     def clone(self):
         return Pawn(self.x, self.y, self.color)
+
+
+# Piece classes by PIECE_TYPE.
+PIECE_CLASSES = {
+    Pawn.PIECE_TYPE: Pawn,
+    Knight.PIECE_TYPE: Knight,
+    Bishop.PIECE_TYPE: Bishop,
+    Rook.PIECE_TYPE: Rook,
+    Queen.PIECE_TYPE: Queen,
+    King.PIECE_TYPE: King,
+}
@@ -0,0 +1,69 @@
+import threading
+from . import board, pieces
+from .ai import AI, SearchAborted
+
+# Thinks on the player's time. While the human player is to move, a background
+# thread guesses their most likely reply and already searches the AI answer
+# to the position after it. When the player then plays the guessed move (a ponder
+# hit) the answer is ready, or the search just keeps running until it is. Any
+# other move (a miss) stops the thread and its result is dropped, but everything
+# it stored in AI.transposition_table stays there for the real search.
+class Ponderer:
+
+    def __init__(self, depth = 3, predict_depth = 2):
+        self.depth = depth
+        self.predict_depth = predict_depth
+        self.hits = 0
+        self.misses = 0
+        self.thread = None
+        self.stop_event = None
+        self.predicted_move = None
+        self.result = None
+
+    # Starts pondering on a position where white (the player) is to move.
+    def start(self, chessboard):
+        self.stop()
+        self.stop_event = threading.Event()
+        self.predicted_move = None
+        self.result = None
+        self.thread = threading.Thread(target=self.ponder, args=(board.Board.clone(chessboard), self.stop_event), daemon=True)
+        self.thread.start()
+
+    def ponder(self, position, stop_event):
+        try:
+            predicted = self.predict_reply(position, stop_event)
+            if predicted is None:
+                return
+            position.perform_move(predicted)
+            self.predicted_move = predicted
+            self.result = AI.get_ai_move(position, [], self.depth, stop_event)
+        except SearchAborted:
+            pass
+
+    # Returns the player's most likely move: the best white move of a shallow search.
+    def predict_reply(self, position, stop_event):
+        return AI.get_best_move(position, pieces.Piece.WHITE, self.predict_depth, stop_event)[0]
+
+    # Called once the player has played the given move. Returns the AI answer
+    # on a ponder hit (waiting for the search to finish if needed), None on a miss.
+    def resolve(self, played_move):
+        if self.thread is None:
+            return None
+        predicted = self.predicted_move
+        if predicted is not None and predicted.equals(played_move):
+            self.thread.join()
+            self.thread = None
+            if self.result is not None:
+                self.hits += 1
+                return self.result
+        self.misses += 1
+        self.stop()
+        return None
+
+    # Stops the ponder search, if any, and waits for the thread to exit.
+    def stop(self):
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
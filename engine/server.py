@@ -0,0 +1,348 @@
+import asyncio, itertools, json, time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from . import notation, pieces
+from .ai import AI
+from .board import Board
+
+# A JSON over HTTP game server for many games at once. The human plays white
+# and the AI black, like in the GUI. The AI moves are searched by a shared
+# pool of worker processes; the event loop itself only validates moves and
+# keeps the sessions.
+#
+#     POST   /games                 {"depth": 3, "movetime": 2, "time_budget": 60}
+#     GET    /games/<id>
+#     POST   /games/<id>/move       {"move": "e2e4"}   (answers with the AI reply)
+#     DELETE /games/<id>
+#     GET    /metrics
+#
+# Scheduling: the search jobs wait in one bounded FIFO queue that as many
+# coroutines as there are workers take from. A game has at most one job at a
+# time (a move sent while the AI is thinking is refused), so the FIFO order
+# serves the games in turn, and a busy game cannot starve the others. When the
+# queue is full, moves are refused with 503 before they are played, which is
+# the backpressure signal for the clients.
+
+# Number of moves the remaining time budget of a game is spread over.
+MOVES_TO_GO = 20
+# Shortest time given to an AI move, also once the time budget is used up.
+MIN_MOVETIME = 0.05
+
+# Accepted ranges of the game options, (type, minimum, maximum).
+GAME_OPTIONS = {
+    "depth": (int, 1, 8),
+    "movetime": (float, MIN_MOVETIME, 60.0),
+    "time_budget": (float, 1.0, 3600.0),
+}
+
+
+class Busy(Exception):
+    pass
+
+
+class RequestError(Exception):
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# Runs in a worker process: searches the AI move for a position, given as a
+# FEN and the Board.recent_keys of the game for the repetition draws. The
+# transposition table of the worker is kept from one job to the next.
+def search_move(fen, keys, depth, movetime):
+    chessboard, color = notation.parse_fen(fen)
+    chessboard.restore_history(keys)
+    start = time.perf_counter()
+    AI.nodes = 0
+    depth, best_move, score = AI.search(chessboard, color, depth, movetime)
+    return {
+        "move": notation.move_to_uci(best_move) if best_move is not None else None,
+        "score": score,
+        "depth": depth,
+        "nodes": AI.nodes,
+        "time": time.perf_counter() - start,
+    }
+
+
+class GameSession:
+
+    def __init__(self, game_id, depth, movetime, time_budget):
+        self.game_id = game_id
+        self.board = Board.new()
+        self.color = pieces.Piece.WHITE
+        # Legal moves of the side to move. Move generation is the expensive
+        # part of a request on the event loop, so it is done once per
+        # position, for parsing, the game-over check and to_json alike.
+        self.legal_moves = self.board.get_possible_moves(self.color)
+        self.moves = []
+        self.status = "playing"
+        self.thinking = False
+        self.depth = depth
+        self.movetime = movetime
+        self.time_left = time_budget
+
+    # Time for the next AI move: the per-move limit, or less when the game's
+    # time budget runs low, but never less than MIN_MOVETIME.
+    def next_movetime(self):
+        return max(MIN_MOVETIME, min(self.movetime, self.time_left / MOVES_TO_GO))
+
+    def play(self, move):
+        self.moves.append(notation.move_to_uci(move))
+        self.board.perform_move(move)
+        self.color = notation.other_color(self.color)
+        self.legal_moves = self.board.get_possible_moves(self.color)
+        if not self.legal_moves:
+            if self.board.is_check(self.color):
+                self.status = "white wins" if self.color == pieces.Piece.BLACK else "black wins"
+            else:
+                self.status = "stalemate"
+        elif self.board.is_repetition(2):
+            self.status = "draw by threefold repetition"
+        elif self.board.is_fifty_move_draw():
+            self.status = "draw by fifty-move rule"
+
+    def to_json(self):
+        return {
+            "id": self.game_id,
+            "fen": notation.to_fen(self.board, self.color),
+            "moves": self.moves,
+            "status": self.status,
+            "legal_moves": [notation.move_to_uci(m) for m in self.legal_moves]
+                           if self.status == "playing" and not self.thinking else [],
+            "time_left": round(self.time_left, 3),
+        }
+
+
+# Hands search jobs to the process pool, at most `workers` at a time, from a
+# bounded FIFO queue.
+class MoveScheduler:
+
+    def __init__(self, workers, max_queue):
+        self.workers = workers
+        self.pool = ProcessPoolExecutor(workers)
+        self.queue = asyncio.Queue(max_queue)
+        self.in_flight = 0
+        self.tasks = []
+
+    def start(self):
+        self.tasks = [asyncio.create_task(self.run()) for i in range(self.workers)]
+
+    def full(self):
+        return self.queue.full()
+
+    # Returns a future for the result of search_move(fen, keys, depth, movetime).
+    def submit(self, fen, keys, depth, movetime):
+        if self.queue.full():
+            raise Busy()
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((future, fen, keys, depth, movetime))
+        return future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            future, fen, keys, depth, movetime = await self.queue.get()
+            self.in_flight += 1
+            pool = self.pool
+            try:
+                result = await loop.run_in_executor(pool, search_move, fen, keys, depth, movetime)
+                if not future.cancelled():
+                    future.set_result(result)
+            except Exception as e:
+                # A worker that died breaks the whole pool; start a new one
+                # (once, whichever coroutine sees it first) for the next jobs.
+                if isinstance(e, BrokenProcessPool) and self.pool is pool:
+                    self.pool = ProcessPoolExecutor(self.workers)
+                    pool.shutdown(wait=False)
+                if not future.cancelled():
+                    future.set_exception(e)
+            finally:
+                self.in_flight -= 1
+
+    async def close(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.pool.shutdown(cancel_futures=True)
+
+
+# Move latency (from receiving the player's move to having the AI reply,
+# queueing included) over the last `window` moves, and queue counters.
+class Metrics:
+
+    def __init__(self, window = 1000):
+        self.latencies = deque(maxlen=window)
+        self.moves = 0
+        self.rejected = 0
+        self.max_queue_depth = 0
+
+    def record(self, latency):
+        self.latencies.append(latency)
+        self.moves += 1
+
+    def percentile(self, fraction):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def to_json(self, scheduler, games):
+        return {
+            "games": games,
+            "moves": self.moves,
+            "rejected": self.rejected,
+            "latency_p50": self.percentile(0.5),
+            "latency_p99": self.percentile(0.99),
+            "queue_depth": scheduler.queue.qsize(),
+            "max_queue_depth": self.max_queue_depth,
+            "in_flight": scheduler.in_flight,
+            "workers": scheduler.workers,
+        }
+
+
+class GameServer:
+
+    def __init__(self, workers = 2, max_queue = 64, depth = 3, movetime = 2.0, time_budget = 120.0):
+        self.scheduler = MoveScheduler(workers, max_queue)
+        self.metrics = Metrics()
+        self.games = {}
+        self.ids = itertools.count(1)
+        self.defaults = {"depth": depth, "movetime": movetime, "time_budget": time_budget}
+
+    async def serve(self, host = "127.0.0.1", port = 8765):
+        self.scheduler.start()
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.scheduler.close()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            method, path, body = await read_request(reader)
+            status, payload = await self.handle(method, path, body)
+        except RequestError as e:
+            status, payload = e.status, {"error": str(e)}
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            status, payload = HTTPStatus.BAD_REQUEST, {"error": f"bad request: {e}"}
+        except Exception as e:
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": repr(e)}
+        data = json.dumps(payload).encode()
+        headers = [f"HTTP/1.1 {status.value} {status.phrase}", "Content-Type: application/json",
+                   f"Content-Length: {len(data)}", "Connection: close"]
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            headers.append("Retry-After: 1")
+        try:
+            writer.write(("\r\n".join(headers) + "\r\n\r\n").encode() + data)
+            await writer.drain()
+            writer.close()
+        except ConnectionError:
+            pass
+
+    async def handle(self, method, path, body):
+        parts = [part for part in path.split("?")[0].split("/") if part]
+        if parts == ["metrics"] and method == "GET":
+            return HTTPStatus.OK, self.metrics.to_json(self.scheduler, len(self.games))
+        if parts == ["games"] and method == "POST":
+            return HTTPStatus.CREATED, self.create_game(body).to_json()
+        if len(parts) >= 2 and parts[0] == "games":
+            game = self.games.get(parts[1])
+            if game is None:
+                raise RequestError(HTTPStatus.NOT_FOUND, f"no game {parts[1]}")
+            if len(parts) == 2 and method == "GET":
+                return HTTPStatus.OK, game.to_json()
+            if len(parts) == 2 and method == "DELETE":
+                del self.games[game.game_id]
+                return HTTPStatus.OK, {"id": game.game_id}
+            if parts[2:] == ["move"] and method == "POST":
+                return HTTPStatus.OK, await self.play_move(game, body.get("move", ""))
+        raise RequestError(HTTPStatus.NOT_FOUND, f"no route for {method} {path}")
+
+    def create_game(self, options):
+        settings = dict(self.defaults)
+        for name, (kind, minimum, maximum) in GAME_OPTIONS.items():
+            if name not in options:
+                continue
+            value = options[name]
+            # bool is an int in Python, but {"depth": true} is a client bug.
+            valid = isinstance(value, (int, float)) and not isinstance(value, bool) and minimum <= value <= maximum
+            if not valid or (kind is int and value != int(value)):
+                raise RequestError(HTTPStatus.BAD_REQUEST,
+                                   f"{name} must be a{'n integer' if kind is int else ' number'} "
+                                   f"from {minimum:g} to {maximum:g}, got {value!r}")
+            settings[name] = kind(value)
+        game = GameSession(str(next(self.ids)), **settings)
+        self.games[game.game_id] = game
+        return game
+
+    # Plays the player's move and answers with the AI reply.
+    async def play_move(self, game, uci):
+        if game.status != "playing":
+            raise RequestError(HTTPStatus.CONFLICT, f"game is over: {game.status}")
+        if game.thinking:
+            raise RequestError(HTTPStatus.CONFLICT, "the AI is still thinking")
+        if not isinstance(uci, str):
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"move must be a UCI string such as \"e2e4\", got {uci!r}")
+        try:
+            move = notation.parse_uci(game.board, game.color, uci, game.legal_moves)
+        except notation.NotationError as e:
+            raise RequestError(HTTPStatus.UNPROCESSABLE_ENTITY, str(e))
+        if self.scheduler.full():
+            self.metrics.rejected += 1
+            raise RequestError(HTTPStatus.SERVICE_UNAVAILABLE, "server busy, retry later")
+
+        start = time.perf_counter()
+        # The player's move is taken back if the AI cannot answer it, so the
+        # game never waits for a reply that will not come.
+        saved = (Board.clone(game.board), game.color, list(game.moves), game.legal_moves)
+        game.play(move)
+        if game.status != "playing":
+            return game.to_json()
+
+        game.thinking = True
+        try:
+            future = self.scheduler.submit(notation.to_fen(game.board, game.color), game.board.recent_keys(),
+                                           game.depth, game.next_movetime())
+            self.metrics.max_queue_depth = max(self.metrics.max_queue_depth, self.scheduler.queue.qsize())
+            result = await future
+            ai_move = notation.parse_uci(game.board, game.color, result["move"], game.legal_moves)
+        except Busy:
+            game.board, game.color, game.moves, game.legal_moves = saved
+            self.metrics.rejected += 1
+            raise RequestError(HTTPStatus.SERVICE_UNAVAILABLE, "server busy, retry later")
+        except Exception as e:
+            game.board, game.color, game.moves, game.legal_moves = saved
+            raise RequestError(HTTPStatus.INTERNAL_SERVER_ERROR, f"the AI move failed, {uci} was taken back: {e!r}")
+        finally:
+            game.thinking = False
+        game.time_left = max(0.0, game.time_left - result["time"])
+        game.play(ai_move)
+        self.metrics.record(time.perf_counter() - start)
+
+        state = game.to_json()
+        state["ai"] = result
+        return state
+
+
+# Reads one HTTP request, returns (method, path, JSON body or {}).
+async def read_request(reader):
+    request_line = (await reader.readline()).decode("latin-1").split()
+    if len(request_line) != 3:
+        raise ValueError("malformed request line")
+    method, path, version = request_line
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1")
+        if line in ("\r\n", "\n", ""):
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    body = json.loads(await reader.readexactly(length)) if length else {}
+    if not isinstance(body, dict):
+        raise ValueError("the body must be a JSON object")
+    return method, path, body
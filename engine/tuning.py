@@ -0,0 +1,258 @@
+import json, time
+import numpy
+from . import notation, pieces
+from .ai import Heuristics
+
+# Texel-style tuning of the piece values and the midgame/endgame piece-square
+# tables of Heuristics, from positions labelled with the result of their game.
+#
+# The evaluation is linear in these parameters. Each piece on the board adds
+#     sign * (value[type] + phase * mg[type, square] + (1 - phase) * eg[type, square])
+# where sign is +1 for white and -1 for black, square is seen from the side of
+# the piece, and phase is 1 in the opening and 0 in a pawn ending. Pawn
+# structure and king safety are not tuned; they are a fixed offset per position.
+# A position is therefore stored as at most 32 (table index, sign) pairs plus
+# its phase, offset and result, about 100 bytes. Numpy can then evaluate and
+# differentiate a whole batch of positions at once.
+#
+# The loss is the cross-entropy between the result and the expected score
+# 1 / (1 + 10 ** (-scale * eval / 400)). Adam minimises it.
+
+PIECE_TYPES = [pieces.Pawn.PIECE_TYPE, pieces.Knight.PIECE_TYPE, pieces.Bishop.PIECE_TYPE,
+               pieces.Rook.PIECE_TYPE, pieces.Queen.PIECE_TYPE, pieces.King.PIECE_TYPE]
+MAX_PIECES = 32
+TABLE_SIZE = len(PIECE_TYPES) * 64
+
+# Layout of the parameter vector: piece values, then midgame tables, then endgame tables.
+VALUES = slice(0, len(PIECE_TYPES))
+MG = slice(VALUES.stop, VALUES.stop + TABLE_SIZE)
+EG = slice(MG.stop, MG.stop + TABLE_SIZE)
+PARAMETER_COUNT = EG.stop
+
+RESULTS = {"1-0": 1.0, "0-1": 0.0, "1/2-1/2": 0.5, "[1.0]": 1.0, "[0.0]": 0.0, "[0.5]": 0.5}
+
+
+# Yields (fen, result) for every line of a file of labelled positions: a FEN or
+# EPD followed somewhere by the result, as "1-0", "0-1", "1/2-1/2" (optionally
+# quoted, e.g. c9 "1-0";) or as [1.0], [0.5], [0.0]. Results are from white's
+# point of view.
+def read_labelled_positions(path):
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            fields = line.split()
+            if len(fields) < 5:
+                continue
+            result = None
+            for field in fields[4:]:
+                result = RESULTS.get(field.strip('";'))
+                if result is not None:
+                    break
+            if result is None:
+                raise notation.NotationError(f"{path}:{line_number}: no game result")
+            yield " ".join(fields[:4]), result
+
+
+# Returns (table indices, signs, phase, offset) for a position.
+def position_features(chessboard):
+    indices = []
+    signs = []
+    phase = 0
+    white_king = None
+    black_king = None
+    for x in range(8):
+        for y in range(8):
+            piece = chessboard.chesspieces[x][y]
+            if piece == 0:
+                continue
+            table = PIECE_TYPES.index(piece.piece_type) * 64
+            if piece.color == pieces.Piece.WHITE:
+                indices.append(table + (7 - y) * 8 + x)
+                signs.append(1)
+                if piece.piece_type == pieces.King.PIECE_TYPE:
+                    white_king = piece
+            else:
+                indices.append(table + y * 8 + x)
+                signs.append(-1)
+                if piece.piece_type == pieces.King.PIECE_TYPE:
+                    black_king = piece
+            phase += Heuristics.PHASE_WEIGHTS[piece.piece_type]
+
+    phase = min(phase, Heuristics.TOTAL_PHASE) / Heuristics.TOTAL_PHASE
+    mg, eg = Heuristics.get_structure_score(chessboard, white_king, black_king)
+    return indices, signs, phase, phase * mg + (1 - phase) * eg
+
+
+# A set of positions in the compact form described at the top of this module.
+class TrainingSet:
+
+    CHUNK = 65536
+
+    def __init__(self, indices, signs, phases, offsets, results):
+        self.indices = indices  # (n, 32) int16, padded with 0
+        self.signs = signs      # (n, 32) int8, 0 for the padding
+        self.phases = phases    # (n,) float32
+        self.offsets = offsets  # (n,) float32
+        self.results = results  # (n,) float32
+
+    def __len__(self):
+        return len(self.results)
+
+    # Reads a file of labelled positions, in chunks so that memory stays close
+    # to the size of the final arrays.
+    @classmethod
+    def load(cls, path, progress = None):
+        chunks = []
+        chunk = None
+        row = 0
+        for fen, result in read_labelled_positions(path):
+            if chunk is None or row == cls.CHUNK:
+                if chunk is not None:
+                    chunks.append(chunk)
+                chunk = cls.empty(cls.CHUNK)
+                row = 0
+            chessboard, color = notation.parse_fen(fen)
+            indices, signs, phase, offset = position_features(chessboard)
+            count = min(len(indices), MAX_PIECES)
+            chunk.indices[row, :count] = indices[:count]
+            chunk.signs[row, :count] = signs[:count]
+            chunk.phases[row] = phase
+            chunk.offsets[row] = offset
+            chunk.results[row] = result
+            row += 1
+            if progress is not None and row == cls.CHUNK:
+                progress(len(chunks) * cls.CHUNK + row)
+        if chunk is not None:
+            chunks.append(chunk.slice(0, row))
+        if not chunks:
+            return cls.empty(0)
+        return cls(*(numpy.concatenate([getattr(c, name) for c in chunks])
+                     for name in ("indices", "signs", "phases", "offsets", "results")))
+
+    @classmethod
+    def empty(cls, size):
+        return cls(numpy.zeros((size, MAX_PIECES), numpy.int16), numpy.zeros((size, MAX_PIECES), numpy.int8),
+                   numpy.zeros(size, numpy.float32), numpy.zeros(size, numpy.float32),
+                   numpy.zeros(size, numpy.float32))
+
+    def slice(self, start, stop):
+        return TrainingSet(self.indices[start:stop], self.signs[start:stop], self.phases[start:stop],
+                           self.offsets[start:stop], self.results[start:stop])
+
+    # The arrays are cached as .npz, which loads in a fraction of a second
+    # where parsing millions of FENs takes minutes.
+    def save(self, path):
+        numpy.savez(path, indices=self.indices, signs=self.signs, phases=self.phases,
+                    offsets=self.offsets, results=self.results)
+
+    @classmethod
+    def load_cache(cls, path):
+        data = numpy.load(path)
+        return cls(data["indices"], data["signs"], data["phases"], data["offsets"], data["results"])
+
+
+# Returns the parameter vector of the current Heuristics and piece values.
+def current_parameters():
+    parameters = numpy.zeros(PARAMETER_COUNT)
+    for i, piece_type in enumerate(PIECE_TYPES):
+        parameters[VALUES.start + i] = pieces.PIECE_CLASSES[piece_type].VALUE
+        parameters[MG.start + i * 64:MG.start + (i + 1) * 64] = Heuristics.MG_TABLES[piece_type]
+        parameters[EG.start + i * 64:EG.start + (i + 1) * 64] = Heuristics.EG_TABLES[piece_type]
+    return parameters
+
+
+# Returns the evaluation of every position of the batch.
+def evaluate(parameters, batch):
+    phases = batch.phases[:, None]
+    per_square = (phases * parameters[MG][batch.indices] + (1 - phases) * parameters[EG][batch.indices]
+                  + parameters[VALUES][batch.indices // 64])
+    return (batch.signs * per_square).sum(axis=1) + batch.offsets
+
+
+# Returns the expected score of every position of the batch.
+def expected_scores(parameters, batch, k):
+    # The logistic function written with tanh, which does not overflow.
+    expected = 0.5 * (1 + numpy.tanh(0.5 * k * evaluate(parameters, batch)))
+    return numpy.clip(expected, 1e-7, 1 - 1e-7)
+
+
+# Returns the summed loss over the batch.
+def total_loss(expected, results):
+    return -numpy.sum(results * numpy.log(expected) + (1 - results) * numpy.log(1 - expected))
+
+
+# Returns the mean loss over the whole training set, batch_size positions at
+# a time so that memory stays bounded.
+def mean_loss(parameters, training_set, scale, batch_size = 16384):
+    k = scale * numpy.log(10) / 400
+    total = 0.0
+    for first in range(0, len(training_set), batch_size):
+        batch = training_set.slice(first, first + batch_size)
+        total += total_loss(expected_scores(parameters, batch, k), batch.results)
+    return total / max(len(training_set), 1)
+
+
+# Returns (mean loss, gradient) over the batch.
+def loss_and_gradient(parameters, batch, scale):
+    k = scale * numpy.log(10) / 400
+    expected = expected_scores(parameters, batch, k)
+    results = batch.results
+    loss = total_loss(expected, results) / len(results)
+
+    # d loss / d eval for every position, spread over the entries it uses.
+    d_eval = (k * (expected - results) / len(results))[:, None] * batch.signs
+    d_mg = (d_eval * batch.phases[:, None]).ravel()
+    d_eg = (d_eval * (1 - batch.phases[:, None])).ravel()
+    flat = batch.indices.ravel()
+    gradient = numpy.zeros(PARAMETER_COUNT)
+    gradient[MG] = numpy.bincount(flat, d_mg, TABLE_SIZE)
+    gradient[EG] = numpy.bincount(flat, d_eg, TABLE_SIZE)
+    gradient[VALUES] = numpy.bincount(flat // 64, d_eval.ravel(), len(PIECE_TYPES))
+    # The king is on the board in every position, its value cannot be tuned.
+    gradient[VALUES.start + PIECE_TYPES.index(pieces.King.PIECE_TYPE)] = 0
+    return loss, gradient
+
+
+# Minimises the loss with Adam over shuffled mini-batches. Calls
+# report(epoch, loss, seconds) after every epoch. Returns the parameters.
+def tune(training_set, parameters, epochs = 20, learning_rate = 1.0, batch_size = 16384, scale = 1.0,
+         seed = 0, report = None):
+    rng = numpy.random.default_rng(seed)
+    m = numpy.zeros_like(parameters)
+    v = numpy.zeros_like(parameters)
+    beta1, beta2, epsilon = 0.9, 0.999, 1e-8
+    step = 0
+    for epoch in range(1, epochs + 1):
+        start = time.perf_counter()
+        order = rng.permutation(len(training_set))
+        epoch_loss = 0.0
+        for first in range(0, len(order), batch_size):
+            rows = order[first:first + batch_size]
+            batch = TrainingSet(training_set.indices[rows], training_set.signs[rows], training_set.phases[rows],
+                                training_set.offsets[rows], training_set.results[rows])
+            loss, gradient = loss_and_gradient(parameters, batch, scale)
+            epoch_loss += loss * len(rows)
+            step += 1
+            m = beta1 * m + (1 - beta1) * gradient
+            v = beta2 * v + (1 - beta2) * gradient * gradient
+            m_hat = m / (1 - beta1 ** step)
+            v_hat = v / (1 - beta2 ** step)
+            parameters = parameters - learning_rate * m_hat / (numpy.sqrt(v_hat) + epsilon)
+        if report is not None:
+            report(epoch, epoch_loss / max(len(order), 1), time.perf_counter() - start)
+    return parameters
+
+
+# Writes the parameters in the format of Heuristics.load_parameters, rounded
+# to whole centipawns and with tables as 8x8 rows, rank 1 first.
+def save_parameters(parameters, path):
+    def table(values):
+        values = [int(round(value)) for value in values]
+        return [values[row * 8:row * 8 + 8] for row in range(8)]
+
+    output = {"piece_values": {}, "mg_tables": {}, "eg_tables": {}}
+    for i, piece_type in enumerate(PIECE_TYPES):
+        output["piece_values"][piece_type] = int(round(parameters[VALUES.start + i]))
+        output["mg_tables"][piece_type] = table(parameters[MG.start + i * 64:MG.start + (i + 1) * 64])
+        output["eg_tables"][piece_type] = table(parameters[EG.start + i * 64:EG.start + (i + 1) * 64])
+    with open(path, "w") as f:
+        json.dump(output, f, indent=1)
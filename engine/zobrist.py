@@ -0,0 +1,57 @@
+import random
+from . import pieces
+
+# Zobrist hashing: every (piece, square) pair, the king-moved flags and the
+# en passant file get a random 64 bit number. The key of a position is the XOR
+# of the numbers of everything on it, so a move only needs a few XORs to update it.
+
+_random = random.Random(0x5EED)
+
+PIECE_KEYS = {}
+for _color in (pieces.Piece.WHITE, pieces.Piece.BLACK):
+    for _piece_type in (pieces.Pawn.PIECE_TYPE, pieces.Knight.PIECE_TYPE, pieces.Bishop.PIECE_TYPE,
+                        pieces.Rook.PIECE_TYPE, pieces.Queen.PIECE_TYPE, pieces.King.PIECE_TYPE):
+        PIECE_KEYS[_color + _piece_type] = [[_random.getrandbits(64) for y in range(8)] for x in range(8)]
+
+WHITE_KING_MOVED = _random.getrandbits(64)
+BLACK_KING_MOVED = _random.getrandbits(64)
+EN_PASSANT_FILE = [_random.getrandbits(64) for x in range(8)]
+
+
+# Returns the number of the given piece standing on (x, y).
+def piece_key(piece, x, y):
+    return PIECE_KEYS[piece.color + piece.piece_type][x][y]
+
+
+# Returns the number for an en passant target, 0 if there is none.
+def en_passant_key(en_passant_target):
+    if en_passant_target is None:
+        return 0
+    return EN_PASSANT_FILE[en_passant_target[0]]
+
+
+# Computes the key of a board from scratch. Board keeps its key up to date
+# incrementally, this is used to initialise it (and to check it).
+def hash_board(board):
+    key = 0
+    for x in range(8):
+        for y in range(8):
+            piece = board.chesspieces[x][y]
+            if piece != 0:
+                key ^= piece_key(piece, x, y)
+    if board.white_king_moved:
+        key ^= WHITE_KING_MOVED
+    if board.black_king_moved:
+        key ^= BLACK_KING_MOVED
+    return key ^ en_passant_key(board.en_passant_target)
+
+
+# Computes the key of the pawns alone, used by the pawn hash table.
+def hash_pawns(board):
+    key = 0
+    for x in range(8):
+        for y in range(8):
+            piece = board.chesspieces[x][y]
+            if piece != 0 and piece.piece_type == pieces.Pawn.PIECE_TYPE:
+                key ^= piece_key(piece, x, y)
+    return key
@@ -1,8 +1,9 @@
+import time
 import pygame
-from board import Board
-import pieces
-import ai
-from move import Move   
+from engine.board import Board
+from engine import pieces, ai
+from engine.move import Move
+from engine.ponder import Ponderer
 
 # Constants
 WIDTH, HEIGHT = 640, 640
@@ -82,6 +83,18 @@ def get_square_under_mouse(pos):
     return pos[0] // SQUARE_SIZE, pos[1] // SQUARE_SIZE
 
 
+# Prints and returns whether the game is drawn by threefold repetition or by
+# the fifty-move rule.
+def is_draw(board_state):
+    if board_state.is_repetition(2):
+        print("Draw (threefold repetition)")
+        return True
+    if board_state.is_fifty_move_draw():
+        print("Draw (fifty-move rule)")
+        return True
+    return False
+
+
 def start_game():
     pygame.init()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
@@ -90,6 +103,10 @@ def start_game():
     load_images()
 
     game_board = Board.new()
+    ponderer = Ponderer(depth=3)
+    ponderer.start(game_board)
+    player_move = None
+    latencies = []
     selected = None
     move_hints = []
     player_turn = True
@@ -154,6 +171,7 @@ def start_game():
                     if move.equals(m):
                         animate_move(screen, clock, game_board, drag_piece, drag_from, (x_to, y_to))
                         game_board.perform_move(m)
+                        player_move = m
                         drag_piece = None
                         player_turn = False
                         break
@@ -167,10 +185,20 @@ def start_game():
                         else:
                             print("Hòa (Stalemate)")
                         running = False
+                    elif is_draw(game_board):
+                        running = False
 
         # AI move
         if not player_turn and running:
-            ai_move = ai.AI.get_ai_move(game_board, [], depth=3)
+            # Perceived latency: from the player's move until the answer is known.
+            start = time.perf_counter()
+            ai_move = ponderer.resolve(player_move)
+            hit = ai_move is not None
+            if not hit:
+                ai_move = ai.AI.get_ai_move(game_board, [], depth=3)
+            latencies.append(time.perf_counter() - start)
+            print(f"AI latency: {latencies[-1]:.2f}s ({'ponder hit' if hit else 'ponder miss'}), "
+                  f"average {sum(latencies) / len(latencies):.2f}s per move")
             if ai_move:
                 animate_move(
                     screen, clock, game_board,
@@ -187,5 +215,10 @@ def start_game():
                 else:
                     print("Stalemate")
                 running = False
+            elif is_draw(game_board):
+                running = False
+            else:
+                ponderer.start(game_board)
         clock.tick(FPS)
+    ponderer.stop()
     pygame.quit()
\ No newline at end of file
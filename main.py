@@ -1,4 +1,9 @@
-import gui
+try:
+    import gui
+except ImportError as e:
+    if e.name != "pygame":
+        raise
+    raise SystemExit("The GUI needs pygame: pip install pygame")
 
 if __name__ == "__main__":
-    gui.start_game()
\ No newline at end of file
+    gui.start_game()
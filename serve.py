@@ -0,0 +1,27 @@
+import argparse, asyncio
+from engine.server import GameServer
+
+# Serves many games at once over JSON/HTTP on localhost, see engine/server.py
+# for the API:
+#
+#     python serve.py --port 8765 --workers 4
+#     curl -X POST localhost:8765/games
+#     curl -X POST localhost:8765/games/1/move -d '{"move": "e2e4"}'
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve chess games against the AI over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=2, help="search processes shared by all games")
+    parser.add_argument("--max-queue", type=int, default=64, help="AI moves that may wait for a worker")
+    parser.add_argument("--depth", type=int, default=3, help="default search depth of a game")
+    parser.add_argument("--movetime", type=float, default=2.0, help="default time limit per AI move in seconds")
+    parser.add_argument("--time-budget", type=float, default=120.0, help="default AI time for a whole game in seconds")
+    args = parser.parse_args()
+
+    server = GameServer(args.workers, args.max_queue, args.depth, args.movetime, args.time_budget)
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,75 @@
+import json
+from engine import analysis, notation
+
+EPD = """\
+4k3/8/8/8/8/8/8/4K2R w K - id "rook";
+nonsense
+4k3/8/8/9/8/8/8/4K2R w K - id "bad fen";
+r3k3/8/8/8/8/8/8/4K3 b q - id "black rook";
+4k3/8/8/8/8/8/8/3QK3 w - - id "queen";
+4k3/8/8/8/8/8/8/2B1K1N1 w - - id "minor pieces";
+"""
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def read_results(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_count_done_truncates_a_partial_line(tmp_path):
+    output = write(tmp_path, "out.jsonl", '{"index": 0}\n{"index": 1}\n{"ind')
+    assert analysis.count_done(output) == 2
+    with open(output) as f:
+        assert f.read() == '{"index": 0}\n{"index": 1}\n'
+    assert analysis.count_done(str(tmp_path / "missing.jsonl")) == 0
+
+
+def test_results_are_written_in_input_order(tmp_path, capsys):
+    output = str(tmp_path / "out.jsonl")
+    assert analysis.analyse_file(write(tmp_path, "in.epd", EPD), output, workers=2, depth=1) == 5
+    results = read_results(output)
+    assert [r["index"] for r in results] == list(range(5))
+    assert [r["id"] for r in results] == ["rook", "bad fen", "black rook", "queen", "minor pieces"]
+    # The unreadable line is skipped, the invalid FEN gets an error line.
+    assert "invalid EPD" in capsys.readouterr().err
+    assert "error" in results[1] and "best_move" not in results[1]
+    assert all(r["best_move"] is not None for r in results if "error" not in r)
+
+
+def test_resume_continues_after_the_done_positions(tmp_path):
+    path = write(tmp_path, "in.epd", EPD)
+    output = str(tmp_path / "out.jsonl")
+    analysis.analyse_file(path, output, workers=1, depth=1)
+    complete = read_results(output)
+    with open(output, "r+") as f:
+        lines = f.readlines()
+        f.seek(0)
+        f.truncate()
+        f.writelines(lines[:2])
+        f.write(lines[2][:10])
+
+    assert analysis.analyse_file(path, output, workers=2, depth=1, resume=True) == 3
+    assert [r["id"] for r in read_results(output)] == [r["id"] for r in complete]
+
+
+def test_read_pgn_positions(tmp_path):
+    path = write(tmp_path, "in.pgn", '[Event "a"]\n\n1. e4 {best} e5 (1... c5) 2. Nf3 1-0\n'
+                                     '[Event "b"]\n\n1. d4 Zz9 2. c4 *\n')
+    positions = list(analysis.read_positions(path))
+    assert [position_id for position_id, fen, keys in positions] == ["1.1", "1.2", "1.3", "2.1"]
+    assert positions[2][1].startswith("rnbqkbnr/pppp1ppp/8/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq")
+
+
+def test_pgn_positions_carry_the_history(tmp_path):
+    path = write(tmp_path, "in.pgn", '[Event "a"]\n\n1. Nf3 Nf6 2. Ng1 Ng8 3. Nf3 *\n')
+    position_id, fen, keys = list(analysis.read_positions(path))[-1]
+    chessboard, color = notation.parse_fen(fen)
+    assert not chessboard.is_repetition()
+    chessboard.restore_history(keys)
+    assert chessboard.is_repetition()
@@ -0,0 +1,101 @@
+import random
+from engine import notation, pieces, zobrist
+from engine.board import Board
+from engine.move import Move
+
+
+def play(chessboard, color, *ucis):
+    for uci in ucis:
+        chessboard.perform_move(notation.parse_uci(chessboard, color, uci))
+        color = notation.other_color(color)
+    return color
+
+
+def assert_keys(chessboard):
+    assert chessboard.zobrist_key == zobrist.hash_board(chessboard)
+    assert chessboard.pawn_key == zobrist.hash_pawns(chessboard)
+
+
+def random_games(games, plies, seed):
+    rng = random.Random(seed)
+    for game in range(games):
+        chessboard = Board.new()
+        color = pieces.Piece.WHITE
+        for ply in range(plies):
+            yield chessboard, color
+            moves = chessboard.get_possible_moves(color)
+            if not moves:
+                break
+            chessboard.perform_move(rng.choice(moves))
+            color = notation.other_color(color)
+
+
+def test_incremental_keys_in_random_games():
+    for chessboard, color in random_games(10, 60, 1):
+        assert_keys(chessboard)
+
+
+def test_incremental_keys_after_castling():
+    for uci in ("e1g1", "e1c1"):
+        chessboard, color = notation.parse_fen("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1")
+        play(chessboard, color, uci)
+        assert chessboard.get_piece(*notation.parse_square(uci[2:])).piece_type == pieces.King.PIECE_TYPE
+        assert_keys(chessboard)
+
+
+def test_incremental_keys_after_promotion():
+    chessboard, color = notation.parse_fen("1n5k/P7/8/8/8/8/8/K7 w - - 0 1")
+    for uci in ("a7a8", "a7b8"):
+        copy = Board.clone(chessboard)
+        play(copy, color, uci)
+        assert copy.get_piece(*notation.parse_square(uci[2:])).piece_type == pieces.Queen.PIECE_TYPE
+        assert_keys(copy)
+
+
+def test_incremental_keys_after_en_passant():
+    chessboard, color = notation.parse_fen("4k3/3p4/8/4P3/8/8/8/4K3 b - - 0 1")
+    play(chessboard, color, "d7d5")
+    assert chessboard.en_passant_target == notation.parse_square("d6")
+    assert_keys(chessboard)
+    # The engine does not generate en passant captures, but plays them.
+    chessboard.perform_move(Move(4, 3, 3, 2))
+    assert chessboard.get_piece(*notation.parse_square("d5")) == 0
+    assert chessboard.en_passant_target is None
+    assert_keys(chessboard)
+
+
+def test_repetition_by_knight_shuffle():
+    chessboard, color = Board.new(), pieces.Piece.WHITE
+    shuffle = ("g1f3", "g8f6", "f3g1", "f6g8")
+    color = play(chessboard, color, *shuffle)
+    assert chessboard.halfmove_clock == 4
+    assert chessboard.is_repetition()
+    assert not chessboard.is_repetition(2)
+    play(chessboard, color, *shuffle)
+    assert chessboard.is_repetition(2)
+    assert chessboard.halfmove_clock == 8
+
+
+def test_irreversible_move_resets_halfmove_clock():
+    chessboard, color = Board.new(), pieces.Piece.WHITE
+    color = play(chessboard, color, "g1f3", "g8f6", "f3g1", "f6g8", "e2e4")
+    assert chessboard.halfmove_clock == 0
+    assert not chessboard.is_repetition()
+    color = play(chessboard, color, "g8f6", "g1f3", "f6g8")
+    assert chessboard.halfmove_clock == 3
+
+
+def test_fifty_move_draw():
+    chessboard, color = notation.parse_fen("4k3/8/8/8/8/8/8/4K1N1 w - - 98 60")
+    assert not chessboard.is_fifty_move_draw()
+    play(chessboard, color, "g1f3", "e8d8")
+    assert chessboard.is_fifty_move_draw()
+
+
+def test_history_survives_fen():
+    chessboard, color = notation.parse_fen("4k3/8/8/8/8/8/8/4K1N1 w - - 0 1")
+    color = play(chessboard, color, "g1f3", "e8d8", "f3g1", "d8e8", "g1f3")
+    rebuilt, color = notation.parse_fen(notation.to_fen(chessboard, color))
+    assert not rebuilt.is_repetition()
+    rebuilt.restore_history(chessboard.recent_keys())
+    assert rebuilt.is_repetition()
@@ -0,0 +1,68 @@
+import random
+from engine import notation, pieces
+from engine.ai import Heuristics
+from engine.board import Board
+
+
+def pawns(*names):
+    return [notation.parse_square(name) for name in names]
+
+
+# The same position with the colors swapped and the board flipped.
+def mirror(chessboard):
+    chesspieces = [[0 for y in range(Board.HEIGHT)] for x in range(Board.WIDTH)]
+    for x in range(Board.WIDTH):
+        for y in range(Board.HEIGHT):
+            piece = chessboard.chesspieces[x][y]
+            if piece != 0:
+                chesspieces[x][7 - y] = type(piece)(x, 7 - y, notation.other_color(piece.color))
+    return Board(chesspieces, chessboard.black_king_moved, chessboard.white_king_moved)
+
+
+def test_isolated_pawn():
+    assert Heuristics.score_pawns(pawns("a2"), [], -1) == (*Heuristics.ISOLATED_PAWN, 0b1)
+
+
+def test_doubled_pawns():
+    mg, eg, files = Heuristics.score_pawns(pawns("e2", "e3", "d2"), pawns("d7", "e7"), -1)
+    assert (mg, eg) == Heuristics.DOUBLED_PAWN
+    assert files == 0b11000
+
+
+def test_passed_pawn():
+    # d7 and e7 stop d5 and c4, the a4 pawn is behind b5, so only b5 is passed.
+    mg, eg, files = Heuristics.score_pawns(pawns("d5", "c4", "b5"), pawns("d7", "e7", "a4"), -1)
+    assert (mg, eg) == (Heuristics.PASSED_PAWN_MG[3], Heuristics.PASSED_PAWN_EG[3])
+    mg, eg, files = Heuristics.score_pawns(pawns("d4", "c5", "b4"), pawns("d2", "e2", "a5"), 1)
+    assert (mg, eg) == (Heuristics.PASSED_PAWN_MG[3], Heuristics.PASSED_PAWN_EG[3])
+
+
+def test_pawn_hash_counts_hits_and_misses():
+    Heuristics.pawn_hash_table.clear()
+    chessboard, color = notation.parse_fen(notation.START_FEN)
+    Heuristics.evaluate(chessboard)
+    Heuristics.evaluate(chessboard)
+    assert (Heuristics.pawn_hash_table.hits, Heuristics.pawn_hash_table.misses) == (1, 1)
+
+    # A knight move keeps the pawn key, a pawn move changes it.
+    chessboard.perform_move(notation.parse_uci(chessboard, color, "g1f3"))
+    Heuristics.evaluate(chessboard)
+    chessboard.perform_move(notation.parse_uci(chessboard, pieces.Piece.BLACK, "e7e5"))
+    Heuristics.evaluate(chessboard)
+    assert (Heuristics.pawn_hash_table.hits, Heuristics.pawn_hash_table.misses) == (2, 2)
+    assert Heuristics.pawn_hash_table.hit_rate() == 0.5
+    Heuristics.pawn_hash_table.clear()
+
+
+def test_evaluation_is_color_symmetric():
+    rng = random.Random(4)
+    for game in range(8):
+        chessboard = Board.new()
+        color = pieces.Piece.WHITE
+        for ply in range(rng.randrange(10, 60)):
+            moves = chessboard.get_possible_moves(color)
+            if not moves:
+                break
+            chessboard.perform_move(rng.choice(moves))
+            color = notation.other_color(color)
+            assert Heuristics.evaluate(mirror(chessboard)) == -Heuristics.evaluate(chessboard)
@@ -0,0 +1,75 @@
+import random
+from engine import notation, pieces
+from engine.ai import AI
+from engine.board import Board
+
+
+def move_set(moves):
+    return sorted((m.xfrom, m.yfrom, m.xto, m.yto) for m in moves)
+
+
+def random_games(games, plies, seed):
+    rng = random.Random(seed)
+    for game in range(games):
+        chessboard = Board.new()
+        color = pieces.Piece.WHITE
+        for ply in range(plies):
+            yield chessboard, color
+            moves = chessboard.get_possible_moves(color)
+            if not moves:
+                break
+            chessboard.perform_move(rng.choice(moves))
+            color = notation.other_color(color)
+
+
+def test_generate_moves_matches_get_possible_moves():
+    rng = random.Random(2)
+    for chessboard, color in random_games(10, 80, 2):
+        legal_moves = chessboard.get_possible_moves(color)
+        staged = list(chessboard.generate_moves(color))
+        assert move_set(staged) == move_set(legal_moves)
+        # Same order as the full list ordered by order_moves.
+        assert [notation.move_to_uci(m) for m in staged] == \
+               [notation.move_to_uci(m) for m in chessboard.order_moves(legal_moves)]
+        if legal_moves:
+            hash_move = rng.choice(legal_moves)
+            staged = list(chessboard.generate_moves(color, hash_move))
+            assert staged[0].equals(hash_move)
+            assert move_set(staged) == move_set(legal_moves)
+
+
+def test_captures_and_quiet_moves_split_possible_moves():
+    for chessboard, color in random_games(5, 80, 3):
+        for column in chessboard.chesspieces:
+            for piece in column:
+                if piece == 0:
+                    continue
+                captures = piece.get_possible_captures(chessboard)
+                quiet_moves = piece.get_possible_quiet_moves(chessboard)
+                assert all(chessboard.get_piece(m.xto, m.yto) != 0 for m in captures)
+                assert all(chessboard.get_piece(m.xto, m.yto) == 0 for m in quiet_moves)
+                assert move_set(captures + quiet_moves) == move_set(piece.get_possible_moves(chessboard))
+
+
+def test_castling_is_a_quiet_move():
+    chessboard, color = notation.parse_fen("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1")
+    king = chessboard.get_piece(*notation.parse_square("e1"))
+    assert {"e1g1", "e1c1"} <= {notation.move_to_uci(m) for m in king.get_possible_quiet_moves(chessboard)}
+    assert king.get_possible_captures(chessboard) == []
+
+
+def test_staged_search_visits_the_nodes_of_the_ordered_full_lists():
+    chessboard, color = notation.parse_fen("r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 1")
+    saved = AI.lazy_move_generation, AI.order_full_move_list
+    results = []
+    try:
+        for lazy, ordered in ((True, False), (False, True)):
+            AI.lazy_move_generation, AI.order_full_move_list = lazy, ordered
+            AI.transposition_table.clear()
+            AI.nodes = 0
+            best_move, score = AI.get_best_move(chessboard, color, 2)
+            results.append((notation.move_to_uci(best_move), score, AI.nodes))
+    finally:
+        AI.lazy_move_generation, AI.order_full_move_list = saved
+        AI.transposition_table.clear()
+    assert results[0] == results[1]
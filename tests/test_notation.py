@@ -0,0 +1,77 @@
+import pytest
+from engine import notation, pieces
+from engine.board import Board
+
+
+FENS = [
+    notation.START_FEN,
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 1",
+    "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 1",
+    "8/5k2/8/8/8/8/3QK3/8 b - - 17 1",
+]
+
+
+# The fullmove number is not kept, the fixtures use 1.
+@pytest.mark.parametrize("fen", FENS)
+def test_fen_round_trip(fen):
+    chessboard, color = notation.parse_fen(fen)
+    assert notation.to_fen(chessboard, color) == fen
+
+
+def test_parse_fen_matches_new_board():
+    chessboard, color = notation.parse_fen(notation.START_FEN)
+    assert color == pieces.Piece.WHITE
+    assert chessboard.zobrist_key == Board.new().zobrist_key
+    assert chessboard.pawn_key == Board.new().pawn_key
+
+
+@pytest.mark.parametrize("fen", ["", "8/8/8 w - -", "9/8/8/8/8/8/8/8 w - -", "8/8/8/8/8/8/8/8 x - -",
+                                 "8/8/8/8/8/8/8/8 w - - x 1"])
+def test_parse_fen_rejects_invalid(fen):
+    with pytest.raises(notation.NotationError):
+        notation.parse_fen(fen)
+
+
+@pytest.mark.parametrize("fen, san, uci", [
+    (notation.START_FEN, "e4", "e2e4"),
+    (notation.START_FEN, "Nf3", "g1f3"),
+    ("r1bqkbnr/pppp1ppp/2n5/4p3/3PP3/8/PPP2PPP/RNBQKBNR w KQkq - 0 3", "dxe5", "d4e5"),
+    ("r1bqkbnr/pppp1ppp/2n5/4p3/3PP3/8/PPP2PPP/RNBQKBNR b KQkq - 0 3", "Nxd4", "c6d4"),
+    ("4k3/8/8/8/8/8/8/R3K2R w KQ - 0 1", "O-O", "e1g1"),
+    ("4k3/8/8/8/8/8/8/R3K2R w KQ - 0 1", "O-O-O+", "e1c1"),
+    ("4k3/8/8/8/8/8/8/R3K2R w KQ - 0 1", "Rhf1", "h1f1"),
+    ("4k3/8/8/8/8/8/8/R3K2R w KQ - 0 1", "Rad1", "a1d1"),
+    ("7k/P7/8/8/8/8/8/K7 w - - 0 1", "a8=Q+", "a7a8"),
+])
+def test_parse_san(fen, san, uci):
+    chessboard, color = notation.parse_fen(fen)
+    assert notation.move_to_uci(notation.parse_san(chessboard, color, san)) == uci
+
+
+def test_parse_san_rejects_ambiguous_and_illegal():
+    chessboard, color = notation.parse_fen("4k3/8/8/8/8/8/4K3/R6R w - - 0 1")
+    for san in ("Rd1", "Ke4", "Nf3", "x"):
+        with pytest.raises(notation.NotationError):
+            notation.parse_san(chessboard, color, san)
+
+
+def test_parse_epd():
+    fen, operations = notation.parse_epd(
+        '2rr3k/pp3pp1/1nnqbN1p/3pN3/2pP4/2P3Q1/PPB4P/R4RK1 w - - bm Qg6 Rf7; id "WAC 001"; c0 "a;b";')
+    assert fen == "2rr3k/pp3pp1/1nnqbN1p/3pN3/2pP4/2P3Q1/PPB4P/R4RK1 w - -"
+    assert operations == {"bm": ["Qg6", "Rf7"], "id": ["WAC 001"], "c0": ["a;b"]}
+    assert notation.parse_epd("8/8/8/8/8/8/8/8 w - -")[1] == {}
+    with pytest.raises(notation.NotationError):
+        notation.parse_epd("8/8/8/8 w")
+
+
+def test_parse_uci():
+    chessboard, color = notation.parse_fen(notation.START_FEN)
+    move = notation.parse_uci(chessboard, color, "g1f3")
+    assert (move.xfrom, move.yfrom, move.xto, move.yto) == (6, 7, 5, 5)
+    assert notation.move_to_uci(move) == "g1f3"
+    legal_moves = chessboard.get_possible_moves(color)
+    assert notation.parse_uci(chessboard, color, "e2e4", legal_moves) in legal_moves
+    for uci in ("e2e5", "e7e5", "e2", "z9z9"):
+        with pytest.raises(notation.NotationError):
+            notation.parse_uci(chessboard, color, uci)
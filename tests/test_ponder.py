@@ -0,0 +1,38 @@
+from engine import pieces
+from engine.board import Board
+from engine.ponder import Ponderer
+
+
+def ponder(chessboard):
+    ponderer = Ponderer(depth=2, predict_depth=1)
+    ponderer.start(chessboard)
+    ponderer.thread.join()
+    return ponderer
+
+
+def test_resolve_returns_the_answer_on_a_hit():
+    chessboard = Board.new()
+    ponderer = ponder(chessboard)
+    predicted = ponderer.predicted_move
+    assert predicted is not None
+
+    answer = ponderer.resolve(predicted)
+    chessboard.perform_move(predicted)
+    assert any(answer.equals(m) for m in chessboard.get_possible_moves(pieces.Piece.BLACK))
+    assert (ponderer.hits, ponderer.misses) == (1, 0)
+    assert ponderer.thread is None
+
+
+def test_resolve_returns_none_on_a_miss():
+    chessboard = Board.new()
+    ponderer = ponder(chessboard)
+    other = next(m for m in chessboard.get_possible_moves(pieces.Piece.WHITE)
+                 if not m.equals(ponderer.predicted_move))
+
+    assert ponderer.resolve(other) is None
+    assert (ponderer.hits, ponderer.misses) == (0, 1)
+    assert ponderer.thread is None
+
+
+def test_resolve_without_pondering():
+    assert Ponderer().resolve(Board.new().get_possible_moves(pieces.Piece.WHITE)[0]) is None
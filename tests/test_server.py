@@ -0,0 +1,151 @@
+import asyncio, json
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+import pytest
+from engine import notation, zobrist
+from engine.server import Busy, GameServer, RequestError, search_move
+
+
+# Stands in for MoveScheduler: runs search_move in the test process, or fails
+# with the given exception.
+class FakeScheduler:
+
+    def __init__(self, error = None, full = False):
+        self.queue = asyncio.Queue()
+        self.error = error
+        self.is_full = full
+        self.jobs = []
+
+    def full(self):
+        return self.is_full
+
+    def submit(self, fen, keys, depth, movetime):
+        self.jobs.append((fen, keys, depth, movetime))
+        if isinstance(self.error, Busy):
+            raise self.error
+        future = asyncio.get_running_loop().create_future()
+        if self.error is not None:
+            future.set_exception(self.error)
+        else:
+            future.set_result(search_move(fen, keys, depth, movetime))
+        return future
+
+
+def make_server(scheduler = None):
+    server = GameServer(workers=1, depth=1, movetime=1.0)
+    server.scheduler.pool.shutdown()
+    server.scheduler = scheduler or FakeScheduler()
+    return server
+
+
+def request(server, method, path, body = None):
+    return asyncio.run(server.handle(method, path, body or {}))
+
+
+def expect_error(server, method, path, body, status):
+    with pytest.raises(RequestError) as error:
+        request(server, method, path, body)
+    assert error.value.status == status
+    return error.value
+
+
+def test_create_game_uses_the_options():
+    server = make_server()
+    status, state = request(server, "POST", "/games", {"depth": 2, "movetime": 0.5, "time_budget": 30})
+    assert status == HTTPStatus.CREATED
+    assert state["status"] == "playing" and len(state["legal_moves"]) == 20
+    game = server.games[state["id"]]
+    assert (game.depth, game.movetime, game.time_left) == (2, 0.5, 30.0)
+
+
+@pytest.mark.parametrize("options", [{"depth": 0}, {"depth": 2.5}, {"depth": True}, {"depth": "3"},
+                                     {"movetime": 0}, {"movetime": -1}, {"movetime": float("inf")},
+                                     {"time_budget": 0}, {"time_budget": None}])
+def test_create_game_rejects_invalid_options(options):
+    server = make_server()
+    expect_error(server, "POST", "/games", options, HTTPStatus.BAD_REQUEST)
+    assert not server.games
+
+
+def test_next_movetime_stays_positive():
+    server = make_server()
+    game = server.create_game({"movetime": 2})
+    game.time_left = 0.0
+    assert game.next_movetime() > 0
+
+
+def test_play_move_answers_with_the_ai_move():
+    server = make_server()
+    server.create_game({})
+    status, state = request(server, "POST", "/games/1/move", {"move": "e2e4"})
+    assert status == HTTPStatus.OK
+    assert state["moves"][0] == "e2e4" and state["moves"][1] == state["ai"]["move"]
+    assert state["fen"].split()[1] == "w" and state["legal_moves"]
+
+
+@pytest.mark.parametrize("body, status", [({"move": 123}, HTTPStatus.BAD_REQUEST),
+                                          ({"move": None}, HTTPStatus.BAD_REQUEST),
+                                          ({"move": "e2e5"}, HTTPStatus.UNPROCESSABLE_ENTITY),
+                                          ({}, HTTPStatus.UNPROCESSABLE_ENTITY)])
+def test_play_move_rejects_invalid_moves(body, status):
+    server = make_server()
+    server.create_game({})
+    expect_error(server, "POST", "/games/1/move", body, status)
+    assert server.games["1"].moves == []
+
+
+def test_play_move_errors():
+    server = make_server()
+    expect_error(server, "POST", "/games/9/move", {"move": "e2e4"}, HTTPStatus.NOT_FOUND)
+    game = server.create_game({})
+    game.thinking = True
+    expect_error(server, "POST", "/games/1/move", {"move": "e2e4"}, HTTPStatus.CONFLICT)
+    game.thinking = False
+    game.status = "stalemate"
+    expect_error(server, "POST", "/games/1/move", {"move": "e2e4"}, HTTPStatus.CONFLICT)
+
+
+def test_play_move_is_refused_when_the_queue_is_full():
+    server = make_server(FakeScheduler(full=True))
+    server.create_game({})
+    expect_error(server, "POST", "/games/1/move", {"move": "e2e4"}, HTTPStatus.SERVICE_UNAVAILABLE)
+    assert server.games["1"].moves == [] and server.metrics.rejected == 1
+
+
+@pytest.mark.parametrize("error, status", [(BrokenProcessPool("worker died"), HTTPStatus.INTERNAL_SERVER_ERROR),
+                                           (Busy(), HTTPStatus.SERVICE_UNAVAILABLE)])
+def test_failed_search_takes_the_move_back(error, status):
+    server = make_server(FakeScheduler(error))
+    state = json.dumps(server.create_game({}).to_json())
+    expect_error(server, "POST", "/games/1/move", {"move": "e2e4"}, status)
+    assert json.dumps(server.games["1"].to_json()) == state
+    # The game goes on once the search works again.
+    server.scheduler = FakeScheduler()
+    assert request(server, "POST", "/games/1/move", {"move": "e2e4"})[1]["moves"][0] == "e2e4"
+
+
+
+def test_search_jobs_carry_the_history():
+    scheduler = FakeScheduler()
+    server = make_server(scheduler)
+    game = server.create_game({})
+    request(server, "POST", "/games/1/move", {"move": "g1f3"})
+    fen, keys, depth, movetime = scheduler.jobs[0]
+    assert keys[-1] == notation.parse_fen(fen)[0].zobrist_key
+    assert len(keys) == 2 and depth == game.depth
+
+
+def test_search_move_sees_repetitions_of_the_game():
+    # The king never moved, but FEN cannot say so without rooks: the parsed
+    # board has another key than the game's board.
+    chessboard, color = notation.parse_fen("4k3/8/8/8/8/8/8/4K1N1 w - - 0 1")
+    chessboard.white_king_moved = chessboard.black_king_moved = False
+    chessboard.zobrist_key = zobrist.hash_board(chessboard)
+    for uci in ("g1f3", "e8d8", "f3g1", "d8e8", "g1f3", "e8d8", "f3g1"):
+        chessboard.perform_move(notation.parse_uci(chessboard, color, uci))
+        color = notation.other_color(color)
+    fen = notation.to_fen(chessboard, color)
+    # Black is lost and goes back to e8 for the draw, which it only knows
+    # about from the history.
+    assert search_move(fen, chessboard.recent_keys(), 2, 1.0)["score"] == 0
+    assert search_move(fen, [notation.parse_fen(fen)[0].zobrist_key], 2, 1.0)["score"] > 0
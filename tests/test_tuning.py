@@ -0,0 +1,70 @@
+import numpy, pytest
+from engine import notation, pieces, tuning
+from engine.ai import Heuristics
+
+LABELLED = """\
+rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - c9 "1/2-1/2";
+r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - c9 "1-0";
+r2q1rk1/ppp2ppp/2np1n2/2b1p1B1/2B1P1b1/2NP1N2/PPP2PPP/R2Q1RK1 w - - [0.5]
+8/5k2/3p4/8/8/3QK3/8/8 b - - [1.0]
+8/2p2k2/8/1P6/8/4K3/8/8 w - - [0.0]
+4k3/8/8/8/8/8/2n5/R3K3 b Q - 0-1
+"""
+
+
+def training_set(tmp_path):
+    path = tmp_path / "labelled.epd"
+    path.write_text(LABELLED)
+    return tuning.TrainingSet.load(str(path))
+
+
+def test_evaluate_matches_heuristics(tmp_path):
+    batch = training_set(tmp_path)
+    scores = tuning.evaluate(tuning.current_parameters(), batch)
+    for line, score in zip(LABELLED.splitlines(), scores):
+        chessboard, color = notation.parse_fen(" ".join(line.split()[:4]))
+        # Heuristics.evaluate truncates to whole centipawns.
+        assert abs(score - Heuristics.evaluate(chessboard)) < 1
+
+
+def test_gradient_matches_finite_differences(tmp_path):
+    batch = training_set(tmp_path)
+    parameters = tuning.current_parameters()
+    loss, gradient = tuning.loss_and_gradient(parameters, batch, 1.0)
+    assert loss == pytest.approx(tuning.mean_loss(parameters, batch, 1.0, batch_size=4))
+
+    used = numpy.unique(batch.indices[batch.signs != 0])
+    checked = [tuning.VALUES.start, tuning.VALUES.start + 1, tuning.VALUES.start + 4]
+    checked += [tuning.MG.start + i for i in used[::5]] + [tuning.EG.start + i for i in used[::5]]
+    step = 0.01
+    for i in checked:
+        plus, minus = parameters.copy(), parameters.copy()
+        plus[i] += step
+        minus[i] -= step
+        numeric = (tuning.loss_and_gradient(plus, batch, 1.0)[0] - tuning.loss_and_gradient(minus, batch, 1.0)[0]) / (2 * step)
+        assert abs(gradient[i] - numeric) < 1e-7 + 1e-4 * abs(numeric)
+    # The king is on the board in every position, its value is not tuned.
+    assert gradient[tuning.VALUES.start + tuning.PIECE_TYPES.index(pieces.King.PIECE_TYPE)] == 0
+
+
+def test_tune_lowers_the_loss(tmp_path):
+    batch = training_set(tmp_path)
+    parameters = tuning.current_parameters()
+    tuned = tuning.tune(batch, parameters, epochs=5, batch_size=4)
+    assert tuning.mean_loss(tuned, batch, 1.0) < tuning.mean_loss(parameters, batch, 1.0)
+
+
+def test_save_and_load_parameters(tmp_path):
+    saved_values = {piece_type: pieces.PIECE_CLASSES[piece_type].VALUE for piece_type in tuning.PIECE_TYPES}
+    saved_mg, saved_eg = dict(Heuristics.MG_TABLES), dict(Heuristics.EG_TABLES)
+    parameters = tuning.current_parameters() + numpy.random.default_rng(0).normal(0, 20, tuning.PARAMETER_COUNT)
+    path = str(tmp_path / "parameters.json")
+    try:
+        tuning.save_parameters(parameters, path)
+        Heuristics.load_parameters(path)
+        assert numpy.array_equal(tuning.current_parameters(), numpy.round(parameters))
+    finally:
+        for piece_type, value in saved_values.items():
+            pieces.PIECE_CLASSES[piece_type].VALUE = value
+        Heuristics.MG_TABLES.update(saved_mg)
+        Heuristics.EG_TABLES.update(saved_eg)
@@ -0,0 +1,37 @@
+import argparse, os
+from engine import ai, tuning
+
+# Tunes the piece values and piece-square tables on labelled positions and
+# writes them where Heuristics loads them at startup:
+#
+#     python tune.py quiet-labeled.epd --epochs 20
+#
+# Every input line is a FEN/EPD with the game result ("1-0", "0-1", "1/2-1/2",
+# or [1.0], [0.5], [0.0]). The parsed positions are cached next to the input
+# as .npz, so later runs skip the parsing. Tuning starts from the current
+# parameters, so running it again continues where the last run stopped.
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tune the evaluation on labelled positions.")
+    parser.add_argument("input", help="file of labelled positions")
+    parser.add_argument("-o", "--output", default=ai.PARAMETERS_FILE)
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--learning-rate", type=float, default=1.0)
+    parser.add_argument("--batch-size", type=int, default=16384)
+    parser.add_argument("--scale", type=float, default=1.0, help="K of the expected score 1 / (1 + 10^(-K * eval / 400))")
+    args = parser.parse_args()
+
+    cache = args.input + ".npz"
+    if os.path.exists(cache) and os.path.getmtime(cache) >= os.path.getmtime(args.input):
+        training_set = tuning.TrainingSet.load_cache(cache)
+    else:
+        training_set = tuning.TrainingSet.load(args.input, lambda count: print(f"parsed {count} positions"))
+        training_set.save(cache)
+    print(f"{len(training_set)} positions")
+
+    parameters = tuning.current_parameters()
+    print(f"initial loss {tuning.mean_loss(parameters, training_set, args.scale, args.batch_size):.5f}")
+    parameters = tuning.tune(training_set, parameters, args.epochs, args.learning_rate, args.batch_size, args.scale,
+                             report=lambda epoch, loss, seconds: print(f"epoch {epoch}: loss {loss:.5f} ({seconds:.2f}s)"))
+    tuning.save_parameters(parameters, args.output)
+    print(f"wrote {args.output}")